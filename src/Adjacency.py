@@ -0,0 +1,98 @@
+from array import array
+
+# Action codes used by the adjacency table, in the order RobotNavigation tries them
+ACTIONS = ('right', 'down', 'left', 'up')
+MOVES = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+class Adjacency:
+    """
+    Compressed sparse row (CSR) table of the free neighbours of every cell.
+
+    The neighbours of cell id c = y*width+x are neighbours[offsets[c]:offsets[c+1]],
+    and codes holds the matching action code (an index into ACTIONS).
+    """
+
+    def __init__(self, width, height, grid):
+        self.width = width
+        self.height = height
+        self.offsets = array('I', [0])
+        self.neighbours = array('I')
+        self.codes = array('B')
+        self.build(grid)
+
+    @classmethod
+    def from_arrays(cls, width, height, offsets, neighbours, codes):
+        """Wraps existing CSR arrays (e.g. views into a compiled map) without rebuilding them."""
+        adjacency = cls.__new__(cls)
+        adjacency.width = width
+        adjacency.height = height
+        adjacency.offsets = offsets
+        adjacency.neighbours = neighbours
+        adjacency.codes = codes
+        return adjacency
+
+    def build(self, grid):
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if np is not None:
+            return self.build_vectorized(grid, np)
+
+        width, height = self.width, self.height
+        offsets, neighbours, codes = self.offsets, self.neighbours, self.codes
+        count = 0
+        for y in range(height):
+            row = y * width
+            for x in range(width):
+                cell = row + x
+                # right, down, left, up
+                if x + 1 < width and not grid[cell + 1]:
+                    neighbours.append(cell + 1); codes.append(0); count += 1
+                if y + 1 < height and not grid[cell + width]:
+                    neighbours.append(cell + width); codes.append(1); count += 1
+                if x > 0 and not grid[cell - 1]:
+                    neighbours.append(cell - 1); codes.append(2); count += 1
+                if y > 0 and not grid[cell - width]:
+                    neighbours.append(cell - width); codes.append(3); count += 1
+                offsets.append(count)
+
+    def build_vectorized(self, grid, np):
+        """Same table as build(), from shifted copies of the whole free-cell mask."""
+        width, height = self.width, self.height
+        free = (np.frombuffer(bytes(grid), dtype=np.uint8) == 0).reshape(height, width)
+        present = np.zeros((height, width, len(MOVES)), dtype=bool) # [y, x, code]: that move leads to a free cell
+        present[:, :-1, 0] = free[:, 1:]
+        present[:-1, :, 1] = free[1:, :]
+        present[:, 1:, 2] = free[:, :-1]
+        present[1:, :, 3] = free[:-1, :]
+        present = present.reshape(-1, len(MOVES))
+
+        cells, codes = np.nonzero(present) # by cell, then by code: the order build() appends in
+        steps = np.array([dx + dy * width for dx, dy in MOVES], dtype=np.int64)
+        offsets = np.zeros(len(present) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum(present.sum(axis=1))
+        self.offsets = array('I', offsets.tobytes())
+        self.neighbours = array('I', (cells + steps[codes]).astype(np.uint32).tobytes())
+        self.codes = array('B', codes.astype(np.uint8).tobytes())
+
+    def cell(self, state):
+        """Returns the cell id of a (x, y) state."""
+        x, y = state
+        return y * self.width + x
+
+    def state(self, cell):
+        """Returns the (x, y) state of a cell id."""
+        y, x = divmod(cell, self.width)
+        return (x, y)
+
+    def actions(self, state):
+        """Returns the actions from the given state in RobotNavigation's (name, (x, y)) format."""
+        width = self.width
+        cell = state[1] * width + state[0]
+        neighbours, codes = self.neighbours, self.codes
+        actions = []
+        for i in range(self.offsets[cell], self.offsets[cell + 1]):
+            y, x = divmod(neighbours[i], width)
+            actions.append((ACTIONS[codes[i]], (x, y)))
+        return actions
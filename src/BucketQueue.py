@@ -0,0 +1,39 @@
+from collections import deque
+
+class BucketQueue:
+    """
+    Dial's bucket queue: a monotone priority queue for small non-negative integer priorities.
+
+    Every queued priority lies in [current, current + max_step], so a ring of
+    max_step + 1 FIFO buckets indexes them by priority % (max_step + 1). push is
+    O(1) and pop is O(1) amortized plus the empty buckets skipped. Priorities must
+    never be lower than the last popped one, which holds for Dijkstra with step
+    costs between 0 and max_step. Items with equal priority come out in push order.
+    """
+
+    def __init__(self, max_step=1):
+        self.buckets = [deque() for _ in range(max_step + 1)]
+        self.max_step = max_step
+        self.current = 0 # lowest priority that can still be queued
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, priority, item):
+        if not self.current <= priority <= self.current + self.max_step:
+            raise ValueError("priority {} outside [{}, {}]".format(priority, self.current, self.current + self.max_step))
+        self.buckets[priority % len(self.buckets)].append(item)
+        self.size += 1
+
+    def pop(self):
+        """Removes and returns the (priority, item) pair with the lowest priority."""
+        if not self.size:
+            raise IndexError("pop from empty bucket queue")
+        buckets = self.buckets
+        bucket = buckets[self.current % len(buckets)]
+        while not bucket:
+            self.current += 1
+            bucket = buckets[self.current % len(buckets)]
+        self.size -= 1
+        return self.current, bucket.popleft()
@@ -0,0 +1,46 @@
+import queue
+
+class SearchCancelled(Exception):
+    """Raised inside a search thread when its EventQueue has been closed."""
+
+class EventQueue:
+    """
+    Thread-safe renderer that forwards search events to a queue.
+
+    A strategy running in a worker thread uses it as its renderer; the GUI thread
+    drains the queue (see Visualizer.play). The queue is bounded, so a search that
+    runs ahead of the display blocks instead of buffering every step in memory.
+    Events are ("step", explored, enqueued, dequeued) and a final ("done", node).
+    """
+
+    def __init__(self, maxsize=100000):
+        self.queue = queue.Queue(maxsize)
+        self.closed = False
+
+    def render(self, explored=(), enqueued=(), dequeued=()):
+        self.put(("step", explored, enqueued, dequeued))
+
+    def finish(self, node):
+        """Signals the end of the search with its result (a goal node or None)."""
+        self.put(("done", node))
+
+    def put(self, event):
+        while True:
+            if self.closed:
+                raise SearchCancelled()
+            try:
+                self.queue.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def get_nowait(self):
+        """Returns the next event, or None if the queue is empty."""
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Stops the producer: its next render() raises SearchCancelled."""
+        self.closed = True
@@ -1,3 +1,27 @@
+import sys
+from array import array
+from Adjacency import Adjacency
+
+# Byte i of a little-endian 64-bit word of 0/1 bytes lands on bit i of the top byte
+_PACK_MAGIC = 0x0102040810204080
+_UNPACK_TABLE = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+def pack_bits(grid):
+    """Packs a 0/1 occupancy bytearray into 1 bit per cell (bit i of byte k is cell 8k+i)."""
+    size = len(grid)
+    padded = bytes(grid) + bytes(-size % 8)
+    words = array('Q')
+    words.frombytes(padded)
+    if sys.byteorder != 'little':
+        words.byteswap()
+    return bytes(((word * _PACK_MAGIC) & 0xFFFFFFFFFFFFFFFF) >> 56 for word in words)
+
+def unpack_bits(packed, size):
+    """Expands bit-packed occupancy back to a bytearray of size 0/1 cells."""
+    grid = bytearray(b"".join(map(_UNPACK_TABLE.__getitem__, packed)))
+    del grid[size:]
+    return grid
+
 class GridParser:
     def __init__(self, filename):
         self.filename = filename
@@ -5,9 +29,24 @@ class GridParser:
         self.grid_w = None
         self.initial = None
         self.goals = []
-        self.walls = []
+        self.rects = [] # obstacles as (x, y, width, height), in file order
+        self.zones = [] # terrain zones as (x, y, width, height, cost), in file order
+        self._walls = None
+        self._grid = None
+        self._costs = None
+        self._cost_range = None
+        self._adjacency = None
         self.parse()
 
+    def adjacency(self):
+        """
+        Returns the neighbour table of the map, built on first use and shared
+        by every problem created from this parser
+        """
+        if self._adjacency is None:
+            self._adjacency = Adjacency(self.grid_w, self.grid_h, self.grid)
+        return self._adjacency
+
     def parse(self):
         """
         input format:
@@ -21,24 +60,120 @@ class GridParser:
         (3,4,3,1)
         (9,3,1,1)
         (8,4,2,1)
+        (0,2,4,1,5)
+
+        Lines of four values are walls (x, y, width, height); a fifth value makes the
+        rectangle a terrain zone whose cells cost that much to enter (default 1).
+        Blank lines are ignored. Malformed lines raise ValueError with their line number.
         """
         with open(self.filename, "r") as file:
-            self.grid_h, self.grid_w = map(int, file.readline().strip()[1:-1].split(","))
-            self.initial = tuple(map(int, file.readline().strip()[1:-1].split(",")))
-
-            for goal in file.readline().strip().split("|"):
-                goal_x, goal_y = map(int, goal.strip()[1:-1].split(","))
-                self.goals.append((goal_x, goal_y))
-
-            for line in file:
-                wall_x, wall_y, wall_w, wall_h = map(int, line.strip()[1:-1].split(","))
-                for i in range(wall_y, wall_y + wall_h):
-                    for j in range(wall_x, wall_x + wall_w):
-                        self.walls.append((j, i))
-
-            # debug
-            # print("Initial state:", self.initial)
-            # print("Goal state:", self.goals)
-            # print("Grid width:", self.grid_w)
-            # print("Grid height:", self.grid_h)
-            # print("Walls:", self.walls)
\ No newline at end of file
+            lines = ((number, line.strip()) for number, line in enumerate(file, 1))
+            lines = ((number, line) for number, line in lines if line)
+
+            number, line = self.next_line(lines, "the grid size [rows, columns]")
+            self.grid_h, self.grid_w = self.parse_values(line, number, "[]", (2,))
+            if self.grid_h <= 0 or self.grid_w <= 0:
+                raise self.error(number, "grid size must be positive", line)
+
+            number, line = self.next_line(lines, "the start position (x, y)")
+            self.initial = self.parse_values(line, number, "()", (2,))
+
+            number, line = self.next_line(lines, "the goal positions (x, y) | (x, y)")
+            self.goals = [self.parse_values(goal, number, "()", (2,)) for goal in line.split("|")]
+
+            for number, line in lines:
+                values = self.parse_values(line, number, "()", (4, 5))
+                if values[2] < 0 or values[3] < 0:
+                    raise self.error(number, "width and height must not be negative", line)
+                if len(values) == 4:
+                    self.rects.append(values)
+                elif 1 <= values[4] <= 0xFFFF:
+                    self.zones.append(values)
+                else:
+                    raise self.error(number, "terrain cost must be between 1 and 65535", line)
+
+    def next_line(self, lines, expected):
+        line = next(lines, None)
+        if line is None:
+            raise ValueError("{}: missing {}".format(self.filename, expected))
+        return line
+
+    def parse_values(self, text, number, brackets, counts):
+        """Parses '(a, b, ...)' (or '[...]') into a tuple of ints with one of the given lengths."""
+        text = text.strip()
+        if len(text) < 2 or text[0] != brackets[0] or text[-1] != brackets[1]:
+            raise self.error(number, "expected {}...{}".format(*brackets), text)
+        try:
+            values = tuple(int(value) for value in text[1:-1].split(","))
+        except ValueError:
+            raise self.error(number, "expected comma-separated integers", text) from None
+        if len(values) not in counts:
+            raise self.error(number, "expected {} values, got {}".format(" or ".join(map(str, counts)), len(values)), text)
+        return values
+
+    def error(self, number, message, text):
+        return ValueError("{}:{}: {}: {!r}".format(self.filename, number, message, text))
+
+    def clip(self, x, y, width, height):
+        """Returns the in-grid column span and row id range of a rectangle, or None if it is outside."""
+        x0, x1 = max(x, 0), min(x + width, self.grid_w)
+        y0, y1 = max(y, 0), min(y + height, self.grid_h)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, x1, range(y0 * self.grid_w, y1 * self.grid_w, self.grid_w)
+
+    @property
+    def grid(self):
+        """Occupancy grid, 1 byte per cell indexed by y*grid_w+x, rasterized from the rectangles on first use."""
+        if self._grid is None:
+            grid = bytearray(self.grid_w * self.grid_h)
+            for rect in self.rects:
+                span = self.clip(*rect)
+                if span:
+                    x0, x1, rows = span
+                    ones = b"\x01" * (x1 - x0)
+                    for row in rows:
+                        grid[row + x0:row + x1] = ones
+            self._grid = grid
+        return self._grid
+
+    @property
+    def costs(self):
+        """Traversal cost of entering each cell, array('H') indexed like grid; None if every cell costs 1."""
+        if self._costs is None and self.zones:
+            costs = array('H', [1]) * (self.grid_w * self.grid_h)
+            for zone in self.zones: # later zones override earlier ones
+                span = self.clip(*zone[:4])
+                if span:
+                    x0, x1, rows = span
+                    values = array('H', [zone[4]]) * (x1 - x0)
+                    for row in rows:
+                        costs[row + x0:row + x1] = values
+            self._costs = costs
+        return self._costs
+
+    @property
+    def cost_range(self):
+        """
+        Bounds (cheapest, costliest) on the step costs, from the zones without rasterizing
+        them: a zone covering the whole grid hides the zones before it and the default cost 1.
+        """
+        if self._cost_range is None:
+            costs = [1]
+            for zone in self.zones:
+                span = self.clip(*zone[:4])
+                if span is None:
+                    continue
+                x0, x1, rows = span
+                if x1 - x0 == self.grid_w and len(rows) == self.grid_h:
+                    costs = []
+                costs.append(zone[4])
+            self._cost_range = (min(costs), max(costs))
+        return self._cost_range
+
+    @property
+    def walls(self):
+        """Every wall cell as an (x, y) tuple, including cells outside the grid, expanded on first use."""
+        if self._walls is None:
+            self._walls = [(j, i) for x, y, w, h in self.rects for i in range(y, y + h) for j in range(x, x + w)]
+        return self._walls
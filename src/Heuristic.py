@@ -0,0 +1,120 @@
+from Landmarks import UNREACHABLE
+
+class Heuristic:
+    """
+    Base class for heuristic engines used by the informed searches.
+
+    Values are memoized per state for the lifetime of the engine, which the
+    strategies create once per search; with memo_size the memo is emptied whenever
+    it would grow past that many states. Subclasses implement evaluate().
+    """
+
+    def __init__(self, memo_size=None):
+        self.memo = {}
+        self.memo_size = memo_size
+
+    def __call__(self, state):
+        value = self.memo.get(state)
+        if value is None:
+            if self.memo_size and len(self.memo) >= self.memo_size:
+                self.memo.clear()
+            value = self.memo[state] = self.evaluate([state])[0]
+        return value
+
+    def batch(self, states):
+        """Returns the heuristic values of a list of states, scoring the unseen ones in one call."""
+        memo = self.memo
+        if self.memo_size and len(memo) + len(states) > self.memo_size:
+            memo.clear()
+        missing = [state for state in states if state not in memo]
+        if missing:
+            for state, value in zip(missing, self.evaluate(missing)):
+                memo[state] = value
+        return [memo[state] for state in states]
+
+    def evaluate(self, states):
+        """Computes the values of a list of states, without memoization."""
+        raise NotImplementedError
+
+class ManhattanHeuristic(Heuristic):
+    """
+    Minimum Manhattan distance to any goal, optionally scaled by the cheapest step cost.
+
+    With many goals the goal coordinates are packed into NumPy arrays and a batch of
+    states is scored with one broadcast; with a few goals a plain loop is faster.
+    """
+
+    VECTOR_THRESHOLD = 8 # goals at which the NumPy path starts to pay off
+
+    def __init__(self, goals, scale=1, memo_size=None):
+        super().__init__(memo_size)
+        self.goals = list(goals) if isinstance(goals, list) else [goals]
+        self.scale = scale
+        self.goal_x = None
+        self.goal_y = None
+        if len(self.goals) >= self.VECTOR_THRESHOLD:
+            try:
+                import numpy as np
+            except ImportError:
+                np = None
+            if np is not None:
+                self.np = np
+                self.goal_x = np.array([goal[0] for goal in self.goals], dtype=np.int64)
+                self.goal_y = np.array([goal[1] for goal in self.goals], dtype=np.int64)
+
+    def evaluate(self, states):
+        scale = self.scale
+        if self.goal_x is not None:
+            np = self.np
+            points = np.array(states, dtype=np.int64).reshape(-1, 2)
+            distances = (np.abs(points[:, 0:1] - self.goal_x) + np.abs(points[:, 1:2] - self.goal_y)).min(axis=1)
+            return (distances * scale).tolist()
+
+        goals = self.goals
+        if len(goals) == 1:
+            goal_x, goal_y = goals[0]
+            return [(abs(x - goal_x) + abs(y - goal_y)) * scale for x, y in states]
+        return [min(abs(x - goal_x) + abs(y - goal_y) for goal_x, goal_y in goals) * scale for x, y in states]
+
+class LandmarkHeuristic(Heuristic):
+    """
+    ALT bound: for each goal g, the largest |d(L, n) - d(L, g)| over the landmarks L
+    (see Landmarks), never below the Manhattan distance; the minimum over the goals.
+    The step counts are multiplied by scale, the cheapest step cost.
+    """
+
+    def __init__(self, landmarks, goals, scale=1):
+        super().__init__()
+        self.landmarks = landmarks
+        self.scale = scale
+        self.width = landmarks.width
+        self.height = landmarks.height
+        self.goals = list(goals) if isinstance(goals, list) else [goals]
+        # (x, y, [(table, distance from its landmark to the goal)]) per goal, skipping
+        # landmarks that cannot reach the goal
+        self.targets = []
+        for x, y in self.goals:
+            tables = []
+            if 0 <= x < self.width and 0 <= y < self.height:
+                cell = y * self.width + x
+                tables = [(table, table[cell]) for table in landmarks.distances if table[cell] != UNREACHABLE]
+            self.targets.append((x, y, tables))
+
+    def evaluate(self, states):
+        width, height, targets = self.width, self.height, self.targets
+        values = []
+        for x, y in states:
+            inside = 0 <= x < width and 0 <= y < height
+            cell = y * width + x
+            best = None
+            for goal_x, goal_y, tables in targets:
+                bound = abs(x - goal_x) + abs(y - goal_y)
+                if inside:
+                    for table, goal_distance in tables:
+                        distance = table[cell]
+                        if distance != UNREACHABLE:
+                            bound = max(bound, abs(distance - goal_distance))
+                if best is None or bound < best:
+                    best = bound
+            values.append(0 if best is None else best * self.scale)
+        return values
@@ -0,0 +1,284 @@
+"""
+Hierarchical pathfinding (HPA*) on RobotNavigation grids.
+
+The grid is split into square clusters. Entrances along the cluster borders and
+the distances between the entrances of each cluster form a small abstract graph,
+built once per map and cached. A query connects the start and goals to that graph,
+searches it with A*, then refines each abstract edge into grid steps. Paths are
+near-optimal rather than optimal.
+
+Precompute and store the abstraction next to a map with:
+
+    python Hierarchical.py <map file> [cluster size]
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict, deque
+from itertools import chain
+
+from Adjacency import ACTIONS, MOVES
+from IndexedHeap import IndexedHeap
+from Node import Node
+from SearchStrategy import InformedSearch
+
+class AbstractGraph:
+    """Entrances of every cluster and the costs between them, keyed by cell id."""
+
+    VERSION = 1
+    ENTRANCE_SPLIT = 6 # entrances at least this wide get a transition at both ends
+    CACHE_SIZE = 32 # abstractions kept in memory, least recently used dropped first
+    _cache = OrderedDict()
+
+    def __init__(self, width, height, grid, cluster_size=10, build=True):
+        self.width = width
+        self.height = height
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.grid_hash = self.hash_grid(grid)
+        self.edges = {} # cell -> {cell: cost}
+        self.cluster_nodes = {} # cluster -> set of entrance cells
+        if build:
+            self.build()
+
+    @staticmethod
+    def hash_grid(grid):
+        return hashlib.blake2b(grid, digest_size=16).hexdigest()
+
+    @classmethod
+    def for_problem(cls, problem, cluster_size=10, filename=None):
+        """
+        Returns the abstraction of the problem's map from the in-memory cache, else
+        from filename when it holds a matching one, else builds and caches it.
+        """
+        key = (problem.width, problem.height, cluster_size, cls.hash_grid(problem.grid))
+        graph = cls._cache.get(key)
+        if graph is not None:
+            cls._cache.move_to_end(key)
+            return graph
+
+        if filename and os.path.exists(filename):
+            try:
+                graph = cls.load(filename, problem.width, problem.height, problem.grid, cluster_size)
+            except (ValueError, KeyError):
+                graph = None # stale or foreign file, rebuild
+        if graph is None:
+            graph = cls(problem.width, problem.height, problem.grid, cluster_size)
+
+        cls._cache[key] = graph
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return graph
+
+    def cluster(self, cell):
+        y, x = divmod(cell, self.width)
+        return (x // self.cluster_size, y // self.cluster_size)
+
+    def state(self, cell):
+        y, x = divmod(cell, self.width)
+        return (x, y)
+
+    def build(self):
+        width, height, size = self.width, self.height, self.cluster_size
+
+        # Entrances across vertical borders (x is the last column of the left cluster)
+        for x in range(size - 1, width - 1, size):
+            for y0 in range(0, height, size):
+                self._add_entrances([(y * width + x, y * width + x + 1) for y in range(y0, min(y0 + size, height))])
+
+        # Entrances across horizontal borders (y is the last row of the upper cluster)
+        for y in range(size - 1, height - 1, size):
+            for x0 in range(0, width, size):
+                self._add_entrances([(y * width + x, (y + 1) * width + x) for x in range(x0, min(x0 + size, width))])
+
+        # Distances between the entrances of each cluster
+        for cluster, nodes in self.cluster_nodes.items():
+            for node in nodes:
+                distances = self.bfs(node, cluster)[0]
+                for other in nodes:
+                    if other != node and other in distances:
+                        self.edges[node][other] = distances[other]
+
+    def _add_entrances(self, pairs):
+        """Adds transitions for each run of border cell pairs that are free on both sides."""
+        grid = self.grid
+        run = []
+        for pair in pairs + [None]:
+            if pair and not grid[pair[0]] and not grid[pair[1]]:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) < self.ENTRANCE_SPLIT:
+                    self._link(*run[len(run) // 2])
+                else:
+                    self._link(*run[0])
+                    self._link(*run[-1])
+                run = []
+
+    def _link(self, a, b):
+        for cell, other in ((a, b), (b, a)):
+            self.edges.setdefault(cell, {})[other] = 1
+            self.cluster_nodes.setdefault(self.cluster(cell), set()).add(cell)
+
+    def bounds(self, cluster):
+        size = self.cluster_size
+        x0, y0 = cluster[0] * size, cluster[1] * size
+        return x0, y0, min(x0 + size, self.width), min(y0 + size, self.height)
+
+    def bfs(self, source, cluster):
+        """Breadth-first search from source restricted to cluster; returns (distances, parents)."""
+        width, grid = self.width, self.grid
+        x0, y0, x1, y1 = self.bounds(cluster)
+        distances, parents = {source: 0}, {source: None}
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            y, x = divmod(cell, width)
+            for dx, dy in MOVES:
+                nx, ny = x + dx, y + dy
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    child = ny * width + nx
+                    if child not in distances and not grid[child]:
+                        distances[child] = distances[cell] + 1
+                        parents[child] = cell
+                        frontier.append(child)
+        return distances, parents
+
+    def save(self, filename):
+        data = {
+            "version": self.VERSION,
+            "width": self.width,
+            "height": self.height,
+            "cluster_size": self.cluster_size,
+            "grid_hash": self.grid_hash,
+            "edges": [[a, b, cost] for a, others in self.edges.items() for b, cost in others.items() if a < b],
+        }
+        with open(filename, "w") as file:
+            json.dump(data, file)
+
+    @classmethod
+    def load(cls, filename, width, height, grid, cluster_size):
+        """Loads a saved abstraction, raising ValueError if it was built for another map."""
+        with open(filename) as file:
+            data = json.load(file)
+        graph = cls(width, height, grid, cluster_size, build=False)
+        if (data["version"], data["width"], data["height"], data["cluster_size"], data["grid_hash"]) != \
+           (cls.VERSION, width, height, cluster_size, graph.grid_hash):
+            raise ValueError(filename + " does not match this map")
+        for a, b, cost in data["edges"]:
+            for cell, other in ((a, b), (b, a)):
+                graph.edges.setdefault(cell, {})[other] = cost
+                graph.cluster_nodes.setdefault(graph.cluster(cell), set()).add(cell)
+        return graph
+
+class HierarchicalSearch(InformedSearch):
+    """HPA* search over a cached AbstractGraph, refined to a step-by-step Node path."""
+
+    def __init__(self, problem, renderer=None, compact=False, cluster_size=10):
+        super().__init__(problem, renderer, compact)
+        self.cluster_size = cluster_size
+
+    def cache_file(self):
+        """Returns the file the abstraction is persisted to next to the map, if known."""
+        filename = getattr(self.problem, "filename", None)
+        return "{}.hpa{}".format(filename, self.cluster_size) if filename else None
+
+    def search(self):
+        problem = self.problem
+        heuristic = self.heuristic = self.make_heuristic()
+        graph = AbstractGraph.for_problem(problem, self.cluster_size, self.cache_file())
+        width = problem.width
+
+        x, y = problem.initial
+        if not problem.check_possible(problem.initial):
+            return None
+        start = y * width + x
+        goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+        goals = {g[1] * width + g[0] for g in goals if problem.check_possible(g)}
+        if start in goals:
+            return Node(problem.initial)
+
+        # Connect the start and the goals to the entrances of their clusters
+        extra = {start: {}}
+        distances = graph.bfs(start, graph.cluster(start))[0]
+        for cell in chain(graph.cluster_nodes.get(graph.cluster(start), ()), goals):
+            if cell in distances and cell != start:
+                extra[start][cell] = distances[cell]
+        for goal in goals:
+            distances = graph.bfs(goal, graph.cluster(goal))[0]
+            for cell in graph.cluster_nodes.get(graph.cluster(goal), ()):
+                if cell in distances and cell != goal:
+                    extra.setdefault(cell, {})[goal] = distances[cell]
+
+        # A* over the abstract graph
+        frontier = IndexedHeap()
+        frontier.push(start, (0, 0), (start, None, 0)) # cell, parent entry, g(n)
+        explored = set()
+        while frontier:
+            self.created_nodes = len(explored) + len(frontier) + 1
+            _, entry = frontier.pop()
+            cell, _, g_n = entry
+            if cell in goals:
+                return self._refine(graph, entry)
+            explored.add(cell)
+            self.expanded_nodes += 1
+
+            enqueued = []
+            for other, cost in chain(graph.edges.get(cell, {}).items(), extra.get(cell, {}).items()):
+                if other in explored:
+                    continue
+                g = g_n + cost
+                priority = (g + heuristic(graph.state(other)), -g) # ties go to the deeper entry
+                if other in frontier:
+                    frontier.decrease_key(other, priority, (other, entry, g))
+                else:
+                    frontier.push(other, priority, (other, entry, g))
+                    enqueued.append(graph.state(other))
+
+            self.visualize((graph.state(cell),), enqueued)
+
+        return None
+
+    def _refine(self, graph, entry):
+        """Expands the abstract path ending at entry into a chain of single-step Nodes."""
+        cells = []
+        while entry:
+            cells.append(entry[0])
+            entry = entry[1]
+        cells.reverse()
+
+        node = Node(graph.state(cells[0]))
+        for a, b in zip(cells, cells[1:]):
+            distances, parents = graph.bfs(a, graph.cluster(a))
+            if b in parents:
+                steps = []
+                while b != a:
+                    steps.append(b)
+                    b = parents[b]
+                steps.reverse()
+            else:
+                steps = [b] # transition between neighbouring clusters
+            for cell in steps:
+                x, y = graph.state(cell)
+                move = (x - node.state[0], y - node.state[1])
+                node = node.child_node(self.problem, (ACTIONS[MOVES.index(move)], (x, y)))
+        return node
+
+    def get_name(self):
+        return "Hierarchical A* (HPA*)"
+
+if __name__ == "__main__":
+    from GridParser import GridParser
+    from Problem import RobotNavigation
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python Hierarchical.py <filename> [cluster size]")
+        sys.exit(1)
+
+    problem = RobotNavigation(GridParser(sys.argv[1]), adjacency=False)
+    strategy = HierarchicalSearch(problem, cluster_size=int(sys.argv[2]) if len(sys.argv) == 3 else 10)
+    graph = AbstractGraph(problem.width, problem.height, problem.grid, strategy.cluster_size)
+    graph.save(strategy.cache_file())
+    print("saved", strategy.cache_file(), len(graph.edges), "entrance nodes")
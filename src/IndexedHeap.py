@@ -0,0 +1,125 @@
+class IndexedHeap:
+    """
+    Binary min-heap of items keyed by state, with a state -> heap position index.
+
+    Entries are ordered by (priority, state), which gives the same tie-breaking as
+    pushing (priority, node) tuples into a PriorityQueue. Supports push, pop,
+    decrease_key in O(log n) and membership tests in O(1). Not thread-safe.
+    """
+
+    def __init__(self):
+        self.heap = [] # [(priority, state), item] entries
+        self.position = {} # state -> index of its entry in heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, state):
+        return state in self.position
+
+    def __iter__(self):
+        """Iterates over the queued items in heap order (not sorted)."""
+        return (entry[1] for entry in self.heap)
+
+    def push(self, state, priority, item):
+        """Adds item under state. Raises KeyError if state is already queued."""
+        if state in self.position:
+            raise KeyError(str(state) + " is already in the heap")
+        self.heap.append([(priority, state), item])
+        self.position[state] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        """Removes and returns the (priority, item) pair with the lowest priority."""
+        heap = self.heap
+        if not heap:
+            raise IndexError("pop from empty heap")
+        last = heap.pop()
+        if heap:
+            entry, heap[0] = heap[0], last
+            self.position[last[0][1]] = 0
+            self._sift_down(0)
+        else:
+            entry = last
+        del self.position[entry[0][1]]
+        return entry[0][0], entry[1]
+
+    def peek(self):
+        """Returns the (priority, item) pair with the lowest priority without removing it."""
+        key, item = self.heap[0]
+        return key[0], item
+
+    def priority(self, state):
+        """Returns the priority of a queued state. Raises KeyError if it is not queued."""
+        return self.heap[self.position[state]][0][0]
+
+    def get(self, state, default=None):
+        """Returns the item queued under state, or default."""
+        index = self.position.get(state)
+        return default if index is None else self.heap[index][1]
+
+    def decrease_key(self, state, priority, item=None):
+        """
+        Lowers the priority of a queued state and optionally replaces its item.
+        Returns False and leaves the entry unchanged if priority is not lower.
+        """
+        index = self.position[state]
+        entry = self.heap[index]
+        if priority >= entry[0][0]:
+            return False
+        entry[0] = (priority, state)
+        if item is not None:
+            entry[1] = item
+        self._sift_up(index)
+        return True
+
+    def remove(self, state):
+        """Removes a queued state and returns its item. Raises KeyError if it is not queued."""
+        heap = self.heap
+        index = self.position.pop(state)
+        entry = heap[index]
+        last = heap.pop()
+        if index < len(heap):
+            heap[index] = last
+            self.position[last[0][1]] = index
+            self._sift_down(index)
+            self._sift_up(self.position[last[0][1]])
+        return entry[1]
+
+    def _sift_up(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        key = entry[0]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if key < parent[0]:
+                heap[index] = parent
+                position[parent[0][1]] = index
+                index = parent_index
+            else:
+                break
+        heap[index] = entry
+        position[key[1]] = index
+
+    def _sift_down(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        key = entry[0]
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            right_index = child_index + 1
+            if right_index < size and heap[right_index][0] < heap[child_index][0]:
+                child_index = right_index
+            child = heap[child_index]
+            if child[0] < key:
+                heap[index] = child
+                position[child[0][1]] = index
+                index = child_index
+            else:
+                break
+        heap[index] = entry
+        position[key[1]] = index
@@ -0,0 +1,163 @@
+"""
+Landmark distance tables for the ALT (A*, landmarks, triangle inequality) heuristic.
+
+For a landmark L and any two cells n and g, |d(L, n) - d(L, g)| <= d(n, g), so exact
+BFS distances from a few well spread landmarks give an admissible bound that follows
+the walls of the map instead of cutting through them like the Manhattan distance.
+"""
+
+import hashlib
+from array import array
+from collections import OrderedDict, deque
+
+from Adjacency import Adjacency
+
+UNREACHABLE = 0xFFFFFFFF
+
+class Landmarks:
+    """
+    Exact BFS distances from count landmarks chosen by farthest-point selection.
+
+    distances[i] is an array('I') indexed by cell id, UNREACHABLE for cells that
+    landmark i cannot reach. Tables are cached per map, so every query on the same
+    grid reuses them.
+    """
+
+    CACHE_SIZE = 32 # maps kept in memory, least recently used dropped first
+    _cache = OrderedDict()
+
+    def __init__(self, width, height, grid, count=8, adjacency=None, seed_cell=None):
+        self.width = width
+        self.height = height
+        self.adjacency = adjacency or Adjacency(width, height, grid)
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self.np = np # vectorizes the precompute when available
+        self.csr = None # (offsets, neighbours) as NumPy arrays, built on the first vectorized BFS
+        self.cells = []
+        self.distances = []
+        self.select(grid, count, seed_cell)
+
+    @classmethod
+    def from_tables(cls, width, height, cells, distances):
+        """Wraps precomputed landmark cells and distance tables (e.g. from a compiled map) without a BFS."""
+        landmarks = cls.__new__(cls)
+        landmarks.width = width
+        landmarks.height = height
+        landmarks.adjacency = None
+        landmarks.np = None
+        landmarks.csr = None
+        landmarks.cells = list(cells)
+        landmarks.distances = list(distances)
+        return landmarks
+
+    @classmethod
+    def for_problem(cls, problem, count=8):
+        """
+        Returns the landmarks of the problem's map: precomputed ones stored with the map,
+        else cached ones, computing them on a miss.
+        """
+        stored = getattr(getattr(problem, 'grid_parser', None), 'landmarks', None)
+        if stored is not None and not getattr(problem, 'edited', False):
+            stored = stored()
+            if stored is not None and len(stored.cells) == count:
+                return stored
+
+        key = (problem.width, problem.height, count, hashlib.blake2b(problem.grid, digest_size=16).digest())
+        landmarks = cls._cache.get(key)
+        if landmarks is not None:
+            cls._cache.move_to_end(key)
+            return landmarks
+
+        seed = None
+        x, y = problem.initial
+        if 0 <= x < problem.width and 0 <= y < problem.height:
+            seed = y * problem.width + x
+        landmarks = cls._cache[key] = cls(problem.width, problem.height, problem.grid, count, problem.adjacency, seed)
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return landmarks
+
+    def select(self, grid, count, seed_cell=None):
+        """
+        Farthest-point selection: the first landmark is the cell farthest from the seed,
+        each next one the cell farthest from all landmarks chosen so far. Cells no
+        landmark reaches count as infinitely far, so every component gets one.
+        """
+        np = self.np
+        if np is not None:
+            free = np.flatnonzero(np.frombuffer(bytes(grid), dtype=np.uint8) == 0)
+        else:
+            free = [cell for cell in range(len(grid)) if not grid[cell]]
+        if not len(free) or count <= 0:
+            return
+        if seed_cell is None or grid[seed_cell]:
+            seed_cell = int(free[0])
+
+        nearest = self.bfs(seed_cell)
+        for _ in range(count):
+            if np is not None:
+                cell = int(free[np.argmax(np.frombuffer(nearest, dtype=np.uint32)[free])])
+            else:
+                cell = max(free, key=nearest.__getitem__)
+            if nearest[cell] == 0:
+                break # every free cell already is a landmark
+            distances = self.bfs(cell)
+            self.cells.append(cell)
+            self.distances.append(distances)
+            if len(self.cells) == 1:
+                nearest = distances # forget the seed, it is not a landmark
+            elif np is not None:
+                nearest = array('I', np.minimum(np.frombuffer(nearest, dtype=np.uint32),
+                                                np.frombuffer(distances, dtype=np.uint32)).tobytes())
+            else:
+                nearest = array('I', map(min, nearest, distances))
+
+    def bfs(self, source):
+        """Returns the BFS distance from source to every cell as an array('I')."""
+        if self.np is not None:
+            return self._bfs_numpy(source)
+
+        adjacency = self.adjacency
+        offsets, neighbours = adjacency.offsets, adjacency.neighbours
+        distances = array('I', [UNREACHABLE]) * (self.width * self.height)
+        distances[source] = 0
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            distance = distances[cell] + 1
+            for i in range(offsets[cell], offsets[cell + 1]):
+                child = neighbours[i]
+                if distances[child] == UNREACHABLE:
+                    distances[child] = distance
+                    frontier.append(child)
+        return distances
+
+    def _bfs_numpy(self, source):
+        """Level-synchronous BFS: each level gathers the CSR neighbours of the whole frontier at once."""
+        np = self.np
+        if self.csr is None:
+            adjacency = self.adjacency
+            self.csr = (np.frombuffer(adjacency.offsets, dtype=np.uint32).astype(np.int64),
+                        np.frombuffer(adjacency.neighbours, dtype=np.uint32).astype(np.int64))
+        offsets, neighbours = self.csr
+        distances = np.full(self.width * self.height, UNREACHABLE, dtype=np.uint32)
+        distances[source] = 0
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            level += 1
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # index of every neighbour slot of the frontier, laid out back to back
+            shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            children = neighbours[shifts + np.arange(total)]
+            children = np.unique(children[distances[children] == UNREACHABLE])
+            distances[children] = level
+            frontier = children
+        return array('I', distances.tobytes())
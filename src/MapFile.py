@@ -0,0 +1,287 @@
+"""
+Compiled binary maps.
+
+Layout (little-endian):
+    header      HEADER: magic, version, flags, width, height, initial x, initial y, goal count, landmark count,
+                cheapest and costliest step cost
+    goals       goal count x (int32 x, int32 y)
+    occupancy   bit-packed walls, (width*height+7)//8 bytes, zero-padded to a multiple of 4
+    costs       if flags & HAS_COSTS: width*height uint16 terrain costs, zero-padded to a multiple of 4
+    landmarks   landmark count x uint32 cell ids, then landmark count x width*height uint32
+                BFS distances (see Landmarks)
+    adjacency   if flags & HAS_ADJACENCY: the CSR neighbour table (see Adjacency), width*height+1
+                uint32 offsets, then offsets[-1] uint32 neighbours and as many uint8 action codes,
+                zero-padded to a multiple of 4
+
+    python MapFile.py compile <map file> <output> [--landmarks 8] [--adjacency]
+    python MapFile.py info <map file or compiled map>
+
+load_map() opens either kind of file; text maps are compiled on first use into a
+cache directory keyed by their content hash (ROBOTNAV_CACHE_DIR, by default
+~/.cache/robotnav), so later loads memory-map the compiled copy, neighbour table
+included, instead of parsing.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from Adjacency import Adjacency
+from GridParser import GridParser, pack_bits, unpack_bits
+from Problem import SPARSE_THRESHOLD
+
+MAGIC = b"RNMP"
+VERSION = 3
+HAS_COSTS = 1
+HAS_ADJACENCY = 2
+HEADER = struct.Struct("<4sHHIIiiIIHH")
+EXTENSION = ".rnmap"
+CHUNK_SIZE = 1 << 20 # bytes hashed at a time when looking up a text map in the cache
+
+def to_bytes(values):
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def padding(size):
+    return bytes(-size % 4)
+
+def compile_map(parser, filename, landmarks=0, adjacency=False):
+    """
+    Writes a parsed map (GridParser or any parser-like object) to filename in the
+    compiled format, with BFS distance tables from landmarks landmarks if non-zero
+    and the neighbour table if adjacency is set.
+    """
+    width, height = parser.grid_w, parser.grid_h
+    costs = getattr(parser, 'costs', None)
+    table = parser.adjacency() if landmarks or adjacency else None
+    tables = None
+    if landmarks:
+        from Landmarks import Landmarks
+        tables = Landmarks(width, height, parser.grid, landmarks, table)
+
+    flags = (HAS_COSTS if costs else 0) | (HAS_ADJACENCY if adjacency else 0)
+    low, high = getattr(parser, 'cost_range', None) or ((min(costs), max(costs)) if costs else (1, 1))
+    with open(filename, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, flags, width, height,
+                               parser.initial[0], parser.initial[1], len(parser.goals),
+                               len(tables.cells) if tables else 0,
+                               low, high))
+        file.write(to_bytes(array('i', [value for goal in parser.goals for value in goal])))
+        occupancy = pack_bits(parser.grid)
+        file.write(occupancy + padding(len(occupancy)))
+        if costs:
+            file.write(to_bytes(array('H', costs)) + padding(2 * width * height))
+        if tables:
+            file.write(to_bytes(array('I', tables.cells)))
+            for distances in tables.distances:
+                file.write(to_bytes(array('I', distances)))
+        if adjacency:
+            file.write(to_bytes(array('I', table.offsets)))
+            file.write(to_bytes(array('I', table.neighbours)))
+            file.write(bytes(table.codes) + padding(len(table.codes)))
+
+class MapFile:
+    """
+    Memory-mapped compiled map with the GridParser attributes, so RobotNavigation(MapFile(...))
+    works. Costs, landmark tables and the neighbour table are used in place from the mapping
+    on little-endian hosts; the occupancy grid is unpacked on first use.
+    """
+
+    def __init__(self, filename, source=None):
+        self.path = filename
+        self.filename = source or filename # the text map, next to which per-map data is stored
+        with open(filename, "rb") as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.views = [] # memoryviews over the mmap, released by close()
+        try:
+            self.read_layout()
+        except BaseException:
+            self.close()
+            raise
+        self._grid = None
+        self._walls = None
+        self._adjacency = None
+        self._landmarks = None
+
+    def read_layout(self):
+        data = self.mmap
+        if len(data) < HEADER.size:
+            raise ValueError(self.path + " is not a compiled map")
+        magic, version, flags, width, height, x, y, goal_count, landmark_count, low, high = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("{} is not a version {} compiled map".format(self.path, VERSION))
+
+        size = width * height
+        occupancy_size = (size + 7) // 8
+        costs_size = 2 * size if flags & HAS_COSTS else 0
+        offset = HEADER.size + 8 * goal_count
+        self.require(offset + occupancy_size + len(padding(occupancy_size)) + costs_size + len(padding(costs_size))
+                     + 4 * landmark_count * (size + 1) + (4 * (size + 1) if flags & HAS_ADJACENCY else 0))
+
+        self.grid_w = width
+        self.grid_h = height
+        self.initial = (x, y)
+        self.cost_range = (low, high) # cheapest and costliest step, so problems need not scan costs
+        goals = struct.unpack_from("<{}i".format(2 * goal_count), data, HEADER.size)
+        self.goals = list(zip(goals[0::2], goals[1::2]))
+
+        body = memoryview(data)
+        self.views.append(body)
+        self.occupancy = body[offset:offset + occupancy_size]
+        self.views.append(self.occupancy)
+        offset += occupancy_size + len(padding(occupancy_size))
+
+        self.costs = None # traversal cost of entering each cell, like GridParser.costs
+        if costs_size:
+            self.costs = self.typed(body[offset:offset + costs_size], 'H')
+            offset += costs_size + len(padding(costs_size))
+
+        self.landmark_cells = list(self.typed(body[offset:offset + 4 * landmark_count], 'I'))
+        offset += 4 * landmark_count
+        self.landmark_tables = []
+        for _ in range(landmark_count):
+            self.landmark_tables.append(self.typed(body[offset:offset + 4 * size], 'I'))
+            offset += 4 * size
+
+        self.csr = None # (offsets, neighbours, codes) of the stored neighbour table
+        if flags & HAS_ADJACENCY:
+            offsets = self.typed(body[offset:offset + 4 * (size + 1)], 'I')
+            offset += 4 * (size + 1)
+            edges = offsets[size]
+            self.require(offset + 5 * edges)
+            neighbours = self.typed(body[offset:offset + 4 * edges], 'I')
+            offset += 4 * edges
+            self.csr = (offsets, neighbours, self.typed(body[offset:offset + edges], 'B'))
+
+    def require(self, size):
+        if len(self.mmap) < size:
+            raise ValueError("{} is truncated: {} bytes, expected {}".format(self.path, len(self.mmap), size))
+
+    def typed(self, view, typecode):
+        """Returns a zero-copy typed view of little-endian data, or a byteswapped copy on big-endian hosts."""
+        self.views.append(view)
+        if sys.byteorder == 'little':
+            view = view.cast(typecode)
+            self.views.append(view)
+            return view
+        values = array(typecode, view.tobytes())
+        values.byteswap()
+        return values
+
+    @property
+    def grid(self):
+        """Occupancy grid, 1 byte per cell indexed by y*grid_w+x, unpacked on first use."""
+        if self._grid is None:
+            self._grid = unpack_bits(self.occupancy, self.grid_w * self.grid_h)
+        return self._grid
+
+    @property
+    def walls(self):
+        if self._walls is None:
+            grid, width = self.grid, self.grid_w
+            self._walls = [(cell % width, cell // width) for cell in range(len(grid)) if grid[cell]]
+        return self._walls
+
+    def adjacency(self):
+        if self._adjacency is None:
+            if self.csr:
+                self._adjacency = Adjacency.from_arrays(self.grid_w, self.grid_h, *self.csr)
+            else:
+                self._adjacency = Adjacency(self.grid_w, self.grid_h, self.grid)
+        return self._adjacency
+
+    def landmarks(self):
+        """Returns the precomputed landmarks as a Landmarks object, or None if the map has none."""
+        if self._landmarks is None and self.landmark_cells:
+            from Landmarks import Landmarks
+            self._landmarks = Landmarks.from_tables(self.grid_w, self.grid_h, self.landmark_cells, self.landmark_tables)
+        return self._landmarks
+
+    def close(self):
+        """Releases the mapping; the object must not be used afterwards."""
+        self.costs = None
+        self.landmark_tables = []
+        self._landmarks = None
+        self.csr = None
+        self._adjacency = None
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        if self.mmap:
+            self.mmap.close()
+            self.mmap = None
+
+def cache_directory():
+    return os.environ.get("ROBOTNAV_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "robotnav")
+
+def load_map(filename, cache=True):
+    """
+    Opens a map file for RobotNavigation. Compiled maps are memory-mapped directly. Text
+    maps are compiled into the cache directory the first time their content is seen and
+    memory-mapped from there; if the cache cannot be written, or the grid is too large
+    for a bitmap (see SPARSE_THRESHOLD), the text map is parsed.
+    """
+    with open(filename, "rb") as file:
+        magic = file.read(len(MAGIC))
+        if magic == MAGIC:
+            return MapFile(filename)
+        if not cache:
+            return GridParser(filename)
+        digest = hashlib.blake2b(magic, digest_size=16)
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    digest = digest.hexdigest()
+    directory = cache_directory()
+    compiled = os.path.join(directory, "{}.v{}{}".format(digest, VERSION, EXTENSION))
+    if not os.path.exists(compiled):
+        import tempfile
+
+        parser = GridParser(filename) # raises on malformed maps before anything is cached
+        if parser.grid_w * parser.grid_h > SPARSE_THRESHOLD:
+            return parser # too large for a bitmap, keep the rectangles for SparseRobotNavigation
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # write to a temporary file and rename it, so concurrent loaders never see a partial map
+            handle, temporary = tempfile.mkstemp(suffix=EXTENSION, dir=directory)
+            os.close(handle)
+            try:
+                compile_map(parser, temporary, adjacency=True)
+                os.replace(temporary, compiled)
+            except BaseException:
+                os.remove(temporary)
+                raise
+        except OSError:
+            return parser
+    return MapFile(compiled, source=filename)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile text maps to the binary map format.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="compile a text map")
+    compile_parser.add_argument("map")
+    compile_parser.add_argument("output")
+    compile_parser.add_argument("--landmarks", type=int, default=0, help="precompute ALT landmark tables")
+    compile_parser.add_argument("--adjacency", action="store_true", help="store the neighbour table")
+
+    info_parser = commands.add_parser("info", help="describe a text or compiled map")
+    info_parser.add_argument("map")
+
+    args = parser.parse_args()
+    if args.command == "compile":
+        compile_map(GridParser(args.map), args.output, args.landmarks, args.adjacency)
+        print("wrote", args.output, os.path.getsize(args.output), "bytes")
+    else:
+        loaded = load_map(args.map)
+        print("{} ({}): {}x{}, start {}, {} goals, {} wall cells, terrain costs: {}, landmarks: {}, adjacency: {}".format(
+            args.map, type(loaded).__name__, loaded.grid_w, loaded.grid_h, loaded.initial, len(loaded.goals),
+            sum(loaded.grid), "yes" if loaded.costs else "no", len(getattr(loaded, 'landmark_cells', ())),
+            "yes" if getattr(loaded, 'csr', None) else "no"))
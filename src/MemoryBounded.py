@@ -0,0 +1,277 @@
+"""
+Memory-bounded informed searches for maps where A* runs out of memory.
+
+IterativeDeepeningAStarSearch (IDA*) keeps only the current path; SMAStarSearch
+(SMA*) keeps at most a fixed number of nodes. Both prune costlier revisits of a
+state with a TranspositionTable of bounded size, so grids do not make them
+re-expand the same cells endlessly, and both bound the heuristic memo to the
+same size.
+"""
+
+from collections import OrderedDict
+from itertools import count
+
+from Heuristic import ManhattanHeuristic
+from IndexedHeap import IndexedHeap
+from Node import Node
+from SearchStrategy import InformedSearch, INFINITY
+
+class TranspositionTable:
+    """Cheapest g(n) seen per state, keeping only the size most recently used states."""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def get(self, state):
+        g = self.entries.get(state)
+        if g is not None:
+            self.entries.move_to_end(state)
+        return g
+
+    def put(self, state, g):
+        entries = self.entries
+        entries[state] = g
+        entries.move_to_end(state)
+        if len(entries) > self.size:
+            entries.popitem(last=False)
+
+class IterativeDeepeningAStarSearch(InformedSearch):
+    """
+    IDA*: depth-first searches bounded by f(n) = g(n) + h(n), each raising the bound to the
+    smallest f that exceeded the last one. Optimal, with memory O(depth) for the path plus
+    the transposition table, which skips states already reached as cheaply in this iteration.
+    created_nodes counts every node generated over all iterations.
+    """
+
+    TABLE_SIZE = 1 << 16
+
+    def __init__(self, problem, renderer=None, compact=False, table_size=TABLE_SIZE):
+        self.table_size = table_size
+        super().__init__(problem, renderer, compact)
+
+    def make_heuristic(self):
+        return ManhattanHeuristic(self.problem.goal, getattr(self.problem, 'min_cost', 1), self.table_size)
+
+    def search(self):
+        self.heuristic = self.make_heuristic()
+        root = Node(self.problem.initial)
+        self.created_nodes = 1
+        if self.is_goal(root):
+            return root
+
+        table = TranspositionTable(self.table_size)
+        bound = self.manhattan_distance(root.state)
+        while bound < INFINITY:
+            table.clear() # entries from a smaller bound do not cover this one
+            node, bound = self.bounded_search(root, bound, table)
+            if node:
+                return node
+        return None
+
+    def bounded_search(self, root, bound, table):
+        """
+        Depth-first search of the nodes with f(n) <= bound. Returns (goal node, bound), or
+        (None, the smallest f above bound) if there is no goal within it.
+        """
+        next_bound = INFINITY
+        on_path = {root.state}
+        stack = [(root, self.successors(root))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                on_path.discard(node.state)
+                continue
+
+            child, f_n = child
+            if f_n > bound:
+                next_bound = min(next_bound, f_n)
+                continue
+            if child.state in on_path:
+                continue
+            g = table.get(child.state)
+            if g is not None and g <= child.path_cost:
+                continue # its subtree was already searched from a path at least as cheap
+            table.put(child.state, child.path_cost)
+
+            if self.is_goal(child):
+                return child, bound
+            on_path.add(child.state)
+            stack.append((child, self.successors(child)))
+        return None, next_bound
+
+    def successors(self, node):
+        """Returns an iterator over (child, f(n)) pairs of node, lowest f first."""
+        children = node.expand(self.problem)
+        self.expanded_nodes += 1
+        self.created_nodes += len(children)
+        self.visualize((node.state,), [child.state for child in children])
+        scored = [(child.path_cost + self.manhattan_distance(child.state), index) for index, child in enumerate(children)]
+        return ((children[index], f_n) for f_n, index in sorted(scored))
+
+    def get_name(self):
+        return "Iterative Deepening A* (IDA*)"
+
+class MemoryNode:
+    """A node held by SMA*, with its generated children and the backed-up f of forgotten ones."""
+
+    __slots__ = ('node', 'parent', 'key', 'f', 'actions', 'next', 'children', 'forgotten')
+
+    def __init__(self, node, parent, key, f):
+        self.node = node
+        self.parent = parent # MemoryNode of node.parent
+        self.key = key # unique id, orders ties in the heaps
+        self.f = f
+        self.actions = None # successor actions, listed on first expansion
+        self.next = 0 # index of the next action to generate
+        self.children = None # action index -> MemoryNode kept in memory, once there is one
+        self.forgotten = None # action index -> f of a child dropped from memory, once there is one
+
+    def complete(self):
+        """Checks if every successor is generated, so f can be backed up from the children."""
+        return self.actions is not None and self.next == len(self.actions)
+
+class SMAStarSearch(InformedSearch):
+    """
+    Simplified Memory-bounded A* (SMA*): A* that holds at most node_cap nodes. Successors are
+    generated one at a time; when memory is full the shallowest highest-f leaf is forgotten
+    and its f kept in its parent, which regenerates it if that f becomes the best again.
+    Optimal when the optimal path has fewer than node_cap states; deeper paths are not
+    searched. A child is dropped when a copy of its state at most as costly is in memory,
+    and the transposition table drops paths costlier than one already seen.
+    created_nodes counts every node generated, including regenerations.
+    """
+
+    NODE_CAP = 1 << 16
+    TABLE_SIZE = 1 << 16
+
+    def __init__(self, problem, renderer=None, compact=False, node_cap=NODE_CAP, table_size=TABLE_SIZE):
+        if node_cap < 2:
+            raise ValueError("SMA* needs room for at least 2 nodes, got {}".format(node_cap))
+        self.node_cap = node_cap
+        self.table_size = table_size
+        super().__init__(problem, renderer, compact)
+
+    def make_heuristic(self):
+        return ManhattanHeuristic(self.problem.goal, getattr(self.problem, 'min_cost', 1), self.table_size)
+
+    def search(self):
+        problem = self.problem
+        self.heuristic = self.make_heuristic()
+        self.open = IndexedHeap() # nodes with successors left to generate, by (f, -depth)
+        self.leaves = IndexedHeap() # evictable nodes without children in memory, by (-f, depth)
+        self.stored = 1
+        self.states = {} # state -> the cheapest MemoryNode of it in memory
+        keys = count(1)
+        table = TranspositionTable(self.table_size)
+
+        root = MemoryNode(Node(problem.initial), None, 0, self.manhattan_distance(problem.initial))
+        self.open.push(root.key, (root.f, 0), root)
+        self.states[root.node.state] = root
+        self.created_nodes = 1
+
+        while self.open:
+            _, best = self.open.peek()
+            if best.f == INFINITY:
+                return None
+            if self.is_goal(best.node):
+                return best.node
+            if best.actions is None:
+                best.actions = problem.actions(best.node.state)
+                self.expanded_nodes += 1 # again after an eviction, as the node is regenerated
+
+            # next new successor, else the forgotten one with the lowest f
+            if best.next < len(best.actions):
+                index, f_n = best.next, best.f
+                best.next += 1
+            elif best.forgotten:
+                index = min(best.forgotten, key=best.forgotten.get)
+                f_n = best.forgotten.pop(index)
+            else:
+                index = None
+
+            if index is not None:
+                child = best.node.child_node(problem, best.actions[index])
+                self.created_nodes += 1
+                g = table.get(child.state)
+                copy = self.states.get(child.state)
+                # dead ends: a copy in memory at most as costly, a strictly cheaper path seen before,
+                # or too deep to fit under the cap
+                dead = (copy is not None and copy.node.path_cost <= child.path_cost or
+                        g is not None and g < child.path_cost or
+                        child.depth >= self.node_cap - 1 and not self.is_goal(child))
+                if not dead:
+                    if g is None or child.path_cost < g:
+                        table.put(child.state, child.path_cost)
+                    f_n = max(f_n, child.path_cost + self.manhattan_distance(child.state)) # pathmax keeps f monotone
+                    self.add(MemoryNode(child, best, next(keys), f_n), index)
+                    self.visualize((best.node.state,), (child.state,))
+
+            if best.complete() and not best.forgotten:
+                self.open.remove(best.key)
+            self.back_up(best)
+            while self.stored > self.node_cap:
+                self.evict()
+
+        return None
+
+    def add(self, record, index):
+        parent = record.parent
+        if not parent.children:
+            if parent.children is None:
+                parent.children = {}
+            if parent.key in self.leaves:
+                self.leaves.remove(parent.key)
+        parent.children[index] = record
+        self.states[record.node.state] = record
+        self.open.push(record.key, (record.f, -record.node.depth), record)
+        self.leaves.push(record.key, (-record.f, record.node.depth), record)
+        self.stored += 1
+
+    def back_up(self, record):
+        """Raises f of fully generated nodes to the lowest f of their children, up the tree."""
+        while record is not None and record.complete():
+            f_n = min([child.f for child in (record.children or {}).values()] + list((record.forgotten or {}).values()),
+                      default=INFINITY)
+            if f_n == record.f:
+                break
+            record.f = f_n
+            depth = record.node.depth
+            if record.key in self.open:
+                self.open.remove(record.key)
+                self.open.push(record.key, (f_n, -depth), record)
+            if record.key in self.leaves:
+                self.leaves.remove(record.key)
+                self.leaves.push(record.key, (-f_n, depth), record)
+            record = record.parent
+
+    def evict(self):
+        """Forgets the shallowest of the highest-f leaves, keeping its f in its parent."""
+        _, leaf = self.leaves.pop()
+        if leaf.key in self.open:
+            self.open.remove(leaf.key)
+        parent = leaf.parent
+        index = next(index for index, child in parent.children.items() if child is leaf)
+        del parent.children[index]
+        if self.states.get(leaf.node.state) is leaf:
+            del self.states[leaf.node.state] # its parent may regenerate it
+        if parent.forgotten is None:
+            parent.forgotten = {}
+        parent.forgotten[index] = leaf.f
+        self.stored -= 1
+        if not parent.children and parent.parent is not None:
+            self.leaves.push(parent.key, (-parent.f, parent.node.depth), parent)
+        if parent.key not in self.open:
+            self.open.push(parent.key, (parent.f, -parent.node.depth), parent)
+        self.visualize(dequeued=(leaf.node.state,))
+
+    def get_name(self):
+        return "Simplified Memory-bounded A* (SMA*)"
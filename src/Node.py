@@ -1,4 +1,6 @@
 class Node:
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'depth')
+
     def __init__(self, state, parent=None, action=None, path_cost=0):
         self.state = state
         self.parent = parent
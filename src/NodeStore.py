@@ -0,0 +1,93 @@
+from array import array
+from Adjacency import ACTIONS
+
+UNSEEN = -2 # parent value of a cell that has not been stored
+ROOT = -1 # parent value of the initial cell
+
+class NodeStore:
+    """
+    Struct-of-arrays storage for search nodes on a RobotNavigation grid.
+
+    Instead of one Node object per expansion, each cell id (y*width+x) has a slot in
+    flat parent, cost and action-code arrays. Paths are rebuilt lazily from the
+    parent array by StoredNode.
+    """
+
+    def __init__(self, problem):
+        size = problem.width * problem.height
+        self.problem = problem
+        self.width = problem.width
+        self.parent = array('i', [UNSEEN]) * size
+        self.cost = array('I', [0]) * size
+        self.action = array('B', [0]) * size
+
+    def __contains__(self, cell):
+        return self.parent[cell] != UNSEEN
+
+    def add(self, cell, parent, action, cost):
+        """Stores a node for cell; parent is a cell id (ROOT for the initial cell)."""
+        self.parent[cell] = parent
+        self.action[cell] = action
+        self.cost[cell] = cost
+
+    def state(self, cell):
+        y, x = divmod(cell, self.width)
+        return (x, y)
+
+    def node(self, cell):
+        """Returns a lightweight Node-like view of the stored node at cell."""
+        return StoredNode(self, cell)
+
+class StoredNode:
+    """Node-like view over a NodeStore slot, compatible with Node.solution() and Node.path()."""
+
+    __slots__ = ('store', 'cell', 'state')
+
+    def __init__(self, store, cell):
+        self.store = store
+        self.cell = cell
+        self.state = store.state(cell)
+
+    def __repr__(self):
+        return "<Node {}>".format(self.state)
+
+    def __eq__(self, other):
+        return hasattr(other, 'state') and self.state == other.state
+
+    def __hash__(self):
+        return hash(self.state)
+
+    @property
+    def parent(self):
+        parent = self.store.parent[self.cell]
+        return None if parent == ROOT else StoredNode(self.store, parent)
+
+    @property
+    def action(self):
+        if self.store.parent[self.cell] == ROOT:
+            return None
+        return (ACTIONS[self.store.action[self.cell]], self.state)
+
+    @property
+    def path_cost(self):
+        return self.store.cost[self.cell]
+
+    @property
+    def depth(self):
+        return len(self.cells()) - 1
+
+    def cells(self):
+        """Returns the cell ids from the initial cell to this one."""
+        parent, cell, cells = self.store.parent, self.cell, []
+        while cell != ROOT:
+            cells.append(cell)
+            cell = parent[cell]
+        cells.reverse()
+        return cells
+
+    def solution(self):
+        store = self.store
+        return [(ACTIONS[store.action[cell]], store.state(cell)) for cell in self.cells()[1:]]
+
+    def path(self):
+        return [StoredNode(self.store, cell) for cell in self.cells()]
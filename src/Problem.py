@@ -1,3 +1,8 @@
+from RectangleIndex import CAPACITY, RectangleIndex
+
+# Grids with more cells than this are loaded as SparseRobotNavigation by default
+SPARSE_THRESHOLD = 1 << 26
+
 class Problem:
     def __init__(self, initial, goal=None):
         self.initial = initial
@@ -23,23 +28,46 @@ class Problem:
         raise NotImplementedError
     
 class RobotNavigation(Problem):
-    def __init__(self, grid_parser):
-        initial = grid_parser.initial
-        goals = grid_parser.goals
+    def __init__(self, grid_parser, adjacency=True, initial=None, goals=None):
+        # initial and goals default to the ones in the map file
+        initial = grid_parser.initial if initial is None else initial
+        goals = grid_parser.goals if goals is None else goals
         width = grid_parser.grid_w
         height = grid_parser.grid_h
-        walls = grid_parser.walls
         super().__init__(initial, goals) # initial and goal are tuples
         # width and height are integers
         self.width = width
         self.height = height
-        self.walls = walls # list of tuples
+        self.grid_parser = grid_parser
+        self._walls = None # list of wall cells, used by the Visualizer; built on first use
+        self.grid = grid_parser.grid # occupancy bytearray indexed by y*width+x
+        self.edited = False # grid is still shared with grid_parser
+        # traversal cost of entering each cell (array('H') indexed like grid), or None when every step costs 1
+        self.costs = getattr(grid_parser, 'costs', None)
+        cost_range = getattr(grid_parser, 'cost_range', None) # cached by the parser, so no scan per problem
+        if cost_range is None:
+            cost_range = (min(self.costs), max(self.costs)) if self.costs else (1, 1)
+        self.min_cost, self.max_cost = cost_range # the cheapest step scales admissible heuristics
+        self.filename = getattr(grid_parser, 'filename', None) # map file, next to which per-map data is stored
+        # precomputed neighbour table for the searches that work on cell ids (compact mode, landmarks),
+        # built on first use and cached on the parser so it is reused across searches
+        self.use_adjacency = adjacency
+        self._adjacency = None
+
+    @property
+    def adjacency(self):
+        """The parser's neighbour table, built on first access; None if disabled or the grid was edited."""
+        if self._adjacency is None and self.use_adjacency and not self.edited:
+            self._adjacency = self.grid_parser.adjacency()
+        return self._adjacency
 
     def actions(self, state):
         """
         Returns the list of possible actions from the current state
         """
         x, y = state
+        # always from the grid, never the neighbour table: turning its cell ids back into
+        # (x, y) actions is no faster, and results must not depend on which search ran first
         actions = [
             ('right', (x+1, y)),
             ('down', (x, y+1)),
@@ -58,15 +86,164 @@ class RobotNavigation(Problem):
         """
         return action[1]
     
+    @property
+    def walls(self):
+        if self._walls is None and not self.edited:
+            self._walls = self.grid_parser.walls
+        if self._walls is None:
+            width, grid = self.width, self.grid
+            self._walls = [(cell % width, cell // width) for cell in range(len(grid)) if grid[cell]]
+        return self._walls
+
+    def add_wall(self, state):
+        """
+        Turns a free cell into a wall. Returns whether the grid changed.
+        """
+        return self.set_wall(state, 1)
+
+    def remove_wall(self, state):
+        """
+        Turns a wall cell into a free cell. Returns whether the grid changed.
+        """
+        return self.set_wall(state, 0)
+
+    def set_wall(self, state, blocked):
+        x, y = state
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            raise ValueError(str(state) + " is outside the grid")
+        cell = y * self.width + x
+        if self.grid[cell] == blocked:
+            return False
+        if not self.edited:
+            # copy on the first edit: the parser, its adjacency table and other problems share the original
+            self.grid = bytearray(self.grid)
+            self._adjacency = None
+            self.edited = True
+        self.grid[cell] = blocked
+        self._walls = None
+        return True
+
+    def path_cost(self, c, state1, action, state2):
+        """
+        Returns the cost of reaching state2 from state1 given the cost c of reaching state1
+        """
+        if self.costs is None:
+            return c + 1
+        return c + self.costs[state2[1] * self.width + state2[0]]
+
     def check_possible(self, state):
         x, y = state
 
+        # Check if the state is out of the grid
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return 0
+
         # Check if the state is the wall
-        for wall_x, wall_y in self.walls:
-            if x == wall_x and y == wall_y: return 0
+        if self.grid[y * self.width + x]: return 0
+
+        return 1
+
+class SparseRobotNavigation(RobotNavigation):
+    """
+    RobotNavigation backed by a RectangleIndex of the GridParser rectangles instead of
+    a dense occupancy grid, for huge maps with few obstacles. Memory grows with the
+    number of rectangles, not with the area.
+
+    check_possible and path_cost query the index. The dense grid is only built if a
+    strategy asks for it (e.g. ALT, HPA* or the wavefront), so prefer the strategies
+    that only use actions() on maps too large for a bitmap.
+    """
+
+    def __init__(self, grid_parser, capacity=CAPACITY, initial=None, goals=None):
+        if not hasattr(grid_parser, 'rects'):
+            raise ValueError("the sparse backend needs a text map parsed by GridParser")
+        initial = grid_parser.initial if initial is None else initial
+        goals = grid_parser.goals if goals is None else goals
+        Problem.__init__(self, initial, goals)
+        self.width = grid_parser.grid_w
+        self.height = grid_parser.grid_h
+        self.grid_parser = grid_parser
+        self.filename = getattr(grid_parser, 'filename', None)
+        self.use_adjacency = False
+        self._adjacency = None
+        self.costs = None # no dense cost array; path_cost queries the zone index
+        self.obstacles = RectangleIndex(self.width, self.height, grid_parser.rects, capacity)
+        self.zones = RectangleIndex(self.width, self.height, grid_parser.zones, capacity) if grid_parser.zones else None
+        self.min_cost, self.max_cost = grid_parser.cost_range
+        # single-cell edits on top of the rectangles
+        self.added = set()
+        self.removed = set()
+        self.edited = False
+        self._walls = None
+        self._grid = None
+
+    @property
+    def grid(self):
+        """Dense occupancy bytearray, built from the rectangles on first use."""
+        if self._grid is None:
+            grid = bytearray(self.grid_parser.grid)
+            width = self.width
+            for x, y in self.added:
+                grid[y * width + x] = 1
+            for x, y in self.removed:
+                grid[y * width + x] = 0
+            self._grid = grid
+        return self._grid
+
+    @property
+    def walls(self):
+        if self._walls is None:
+            walls = self.grid_parser.walls
+            if self.edited:
+                walls = [wall for wall in walls if not self.check_possible(wall)]
+                walls += sorted(self.added)
+            self._walls = walls
+        return self._walls
+
+    def set_wall(self, state, blocked):
+        x, y = state
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            raise ValueError(str(state) + " is outside the grid")
+        if (not self.check_possible(state)) == bool(blocked):
+            return False
+        in_rectangle = self.obstacles.contains(x, y)
+        self.added.discard(state)
+        self.removed.discard(state)
+        if blocked and not in_rectangle:
+            self.added.add(state)
+        elif not blocked and in_rectangle:
+            self.removed.add(state)
+        if self._grid is not None:
+            self._grid[y * self.width + x] = blocked
+        self.edited = True
+        self._walls = None
+        return True
+
+    def path_cost(self, c, state1, action, state2):
+        if self.zones is None:
+            return c + 1
+        zones = self.zones.find(state2[0], state2[1])
+        return c + (zones[-1][4] if zones else 1) # later zones override earlier ones
+
+    def check_possible(self, state):
+        x, y = state
 
         # Check if the state is out of the grid
         if x < 0 or x >= self.width or y < 0 or y >= self.height:
             return 0
-        
-        return 1
\ No newline at end of file
+
+        if self.edited:
+            if state in self.added:
+                return 0
+            if state in self.removed:
+                return 1
+        return 0 if self.obstacles.contains(x, y) else 1
+
+def create_problem(grid_parser, initial=None, goals=None):
+    """
+    Returns a RobotNavigation for the parsed map, or a SparseRobotNavigation when the
+    grid has more than SPARSE_THRESHOLD cells and the parser kept its rectangles
+    """
+    if grid_parser.grid_w * grid_parser.grid_h > SPARSE_THRESHOLD and hasattr(grid_parser, 'rects'):
+        return SparseRobotNavigation(grid_parser, initial=initial, goals=goals)
+    return RobotNavigation(grid_parser, initial=initial, goals=goals)
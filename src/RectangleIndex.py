@@ -0,0 +1,108 @@
+CAPACITY = 8 # partially overlapping rectangles a leaf holds before it splits
+
+# Node layout: [x, y, size, covering entries, overlapping entries, children or None]
+X, Y, SIZE, COVERING, ITEMS, CHILDREN = range(6)
+
+class RectangleIndex:
+    """
+    Region quadtree over axis-aligned rectangles, for point queries on huge grids.
+
+    Items are tuples whose first four values are (x, y, width, height); any extra
+    values (e.g. a terrain cost) are carried along. Rectangles are clipped to the
+    width x height area. A node that a rectangle covers completely keeps it in its
+    covering list, so no point test is needed below it; a leaf keeps the rectangles
+    that only overlap it and splits into quadrants once it holds more than capacity.
+    Dense clusters therefore get small leaves and empty areas stay single nodes: a
+    point query walks one root-to-leaf path and tests at most about capacity
+    rectangles, however unevenly the obstacles are spread.
+    """
+
+    def __init__(self, width, height, items, capacity=CAPACITY):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        size = 1
+        while size < max(width, height):
+            size *= 2
+        self.root = [0, 0, size, [], [], None]
+        self.count = 0
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return self.count
+
+    def add(self, item):
+        """Registers a rectangle; later items come after earlier ones in find() results."""
+        x, y, w, h = item[:4]
+        x0, x1 = max(x, 0), min(x + w, self.width)
+        y0, y1 = max(y, 0), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.insert(self.root, (x0, y0, x1, y1, self.count, item))
+        self.count += 1
+
+    def insert(self, node, entry):
+        """Files a clipped (x0, y0, x1, y1, order, item) entry under node."""
+        x0, y0, x1, y1 = entry[:4]
+        width, height, capacity = self.width, self.height, self.capacity
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            nx, ny, size = node[X], node[Y], node[SIZE]
+            if x0 <= nx and y0 <= ny and x1 >= min(nx + size, width) and y1 >= min(ny + size, height):
+                node[COVERING].append(entry)
+            elif node[CHILDREN] is None:
+                node[ITEMS].append(entry)
+                if len(node[ITEMS]) > capacity and size > 1:
+                    self.split(node)
+            else:
+                half = size // 2
+                for child in node[CHILDREN]:
+                    cx, cy = child[X], child[Y]
+                    if x0 < cx + half and cx < x1 and y0 < cy + half and cy < y1:
+                        stack.append(child)
+
+    def split(self, node):
+        nx, ny, half = node[X], node[Y], node[SIZE] // 2
+        # quadrant index: (x >= nx + half) + 2 * (y >= ny + half)
+        node[CHILDREN] = [[nx + dx, ny + dy, half, [], [], None] for dy in (0, half) for dx in (0, half)]
+        items, node[ITEMS] = node[ITEMS], []
+        for entry in items:
+            self.insert(node, entry)
+
+    def leaf_path(self, x, y):
+        """Yields the nodes from the root down to the leaf containing (x, y)."""
+        node = self.root
+        while node is not None:
+            yield node
+            children = node[CHILDREN]
+            if children is None:
+                return
+            half = node[SIZE] // 2
+            node = children[(x >= node[X] + half) + 2 * (y >= node[Y] + half)]
+
+    def find(self, x, y):
+        """Returns the items whose rectangle contains (x, y), in insertion order."""
+        found = []
+        for node in self.leaf_path(x, y):
+            found.extend(node[COVERING])
+            found.extend(entry for entry in node[ITEMS]
+                         if entry[0] <= x < entry[2] and entry[1] <= y < entry[3])
+        found.sort(key=lambda entry: entry[4])
+        return [entry[5] for entry in found]
+
+    def contains(self, x, y):
+        """Checks if any rectangle contains (x, y)."""
+        node = self.root
+        while True:
+            if node[COVERING]:
+                return True
+            children = node[CHILDREN]
+            if children is None:
+                for entry in node[ITEMS]:
+                    if entry[0] <= x < entry[2] and entry[1] <= y < entry[3]:
+                        return True
+                return False
+            half = node[SIZE] // 2
+            node = children[(x >= node[X] + half) + 2 * (y >= node[Y] + half)]
@@ -1,19 +1,47 @@
 from collections import deque
-from queue import PriorityQueue
+from BucketQueue import BucketQueue
+from IndexedHeap import IndexedHeap
+from Heuristic import LandmarkHeuristic, ManhattanHeuristic
+from Landmarks import Landmarks
 from Node import Node
+from NodeStore import NodeStore, ROOT
+
+INFINITY = float("inf")
 
 class UninformedSearch:
     """Base class for uninformed search strategies."""
 
-    def __init__(self, problem, renderer=None):
+    def __init__(self, problem, renderer=None, compact=False):
         self.problem = problem
         self.renderer = renderer
         self.created_nodes = 0
+        self.expanded_nodes = 0 # nodes whose successors were generated, over every search() call
+        # Strategies that support it keep their nodes in a NodeStore instead of Node objects
+        self.compact = compact
 
     def search(self):
         """Performs the search based on the specific strategy's logic."""
         raise NotImplementedError("Subclasses must implement the search() method.")
     
+    def record(self, filename, compress=False):
+        """
+        Runs search() while writing its events to a binary trace file (see Trace.py),
+        still forwarding them to the renderer. Returns the search result.
+        """
+        from Trace import TraceRecorder
+
+        recorder = TraceRecorder(filename, self.problem, compress, self.renderer)
+        self.renderer = recorder
+        try:
+            node = self.search()
+        except BaseException:
+            recorder.close()
+            raise
+        finally:
+            self.renderer = recorder.renderer
+        recorder.finish(node, self.created_nodes)
+        return node
+
     def get_name(self):
         """Returns the name of the search strategy."""
         raise NotImplementedError("Subclasses must implement the get_name() method.")
@@ -22,36 +50,78 @@ class UninformedSearch:
         """Checks if the given node is a goal state."""
         return self.problem.goal_test(node.state)
     
+    def use_compact(self):
+        """Checks if the compact node store was requested and the problem supports it."""
+        problem = self.problem
+        if not self.compact or getattr(problem, 'adjacency', None) is None:
+            return False
+        x, y = problem.initial
+        return 0 <= x < problem.width and 0 <= y < problem.height
+
+    def goal_cells(self):
+        """Returns the cell ids of the goal states inside the grid."""
+        problem = self.problem
+        goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+        return {y * problem.width + x for x, y in goals if 0 <= x < problem.width and 0 <= y < problem.height}
+
+    def is_weighted(self):
+        """Checks if the problem has terrain costs, so steps do not all cost the same."""
+        problem = self.problem
+        return getattr(problem, 'costs', None) is not None or getattr(problem, 'zones', None) is not None
+
+    def delegate(self, strategy_class):
+        """Runs strategy_class on the same problem and renderer in place of this strategy."""
+        strategy = strategy_class(self.problem, self.renderer, self.compact)
+        node = strategy.search()
+        self.created_nodes = strategy.created_nodes
+        self.expanded_nodes += strategy.expanded_nodes
+        return node
+
     def get_created_nodes(self):
         """Returns the number of created nodes during the search."""
 
         return self.created_nodes
+
+    def get_expanded_nodes(self):
+        """Returns the number of nodes expanded so far."""
+        return self.expanded_nodes
     
-    def visualize(self, explored, frontier):
-        """Visualizes the explored and frontier nodes."""
+    def visualize(self, explored=(), enqueued=(), dequeued=()):
+        """
+        Sends the changes since the previous step to the renderer: newly explored
+        states, newly enqueued states and states dropped from the frontier unexplored.
+        """
 
         if self.renderer:
-            self.renderer.render(explored, frontier)
+            self.renderer.render(explored, enqueued, dequeued)
         
 class InformedSearch(UninformedSearch):
     """Base class for informed search strategies."""
 
+    def __init__(self, problem, renderer=None, compact=False):
+        super().__init__(problem, renderer, compact)
+        self.heuristic = self.make_heuristic()
+
+    def make_heuristic(self):
+        """Returns a fresh heuristic engine; called at the start of every search."""
+        # every step costs at least min_cost, so the scaled distance stays admissible on weighted maps
+        return ManhattanHeuristic(self.problem.goal, getattr(self.problem, 'min_cost', 1))
+
     def manhattan_distance(self, state):
-        # Calculate the Manhattan distance to each goal state
-        
-        # Formula for Manhattan distance: |x1 - x2| + |y1 - y2|
-        distances = [abs(state[0] - goal[0]) + abs(state[1] - goal[1]) for goal in self.problem.goal]
-        
-        # Return the minimum distance among all goal states
-        return min(distances)
+        # Minimum of |x1 - x2| + |y1 - y2| over all goal states, memoized per search
+        return self.heuristic(state)
     
 
 class BreadthFirstSearch(UninformedSearch):
     """Breadth-First Search implementation."""
 
     def search(self):
+        if self.use_compact():
+            return self.search_compact()
+
         frontier = deque([Node(self.problem.initial)])  # FIFO queue
         explored = set()
+        seen = {self.problem.initial}  # every state ever enqueued, for O(1) duplicate checks
 
         while frontier:
             node = frontier.popleft()
@@ -61,11 +131,50 @@ class BreadthFirstSearch(UninformedSearch):
             if self.is_goal(node):
                 return node
             
+            self.expanded_nodes += 1
+            enqueued = []
             for child in reversed(node.expand(self.problem)):
-                if child.state not in explored and child not in frontier:
+                if child.state not in seen:
+                    seen.add(child.state)
+                    frontier.append(child)
+                    enqueued.append(child.state)
+
+            self.visualize((node.state,), enqueued)
+
+        return None
+
+    def search_compact(self):
+        """Same search over cell ids, with nodes kept in a NodeStore."""
+        adjacency = self.problem.adjacency
+        offsets, neighbours, codes = adjacency.offsets, adjacency.neighbours, adjacency.codes
+        store = NodeStore(self.problem)
+        goals = self.goal_cells()
+        costs = getattr(self.problem, 'costs', None)
+
+        start = adjacency.cell(self.problem.initial)
+        store.add(start, ROOT, 0, 0)
+        frontier = deque([start])
+        explored = 0
+
+        while frontier:
+            cell = frontier.popleft()
+            explored += 1
+
+            self.created_nodes = explored + len(frontier) + 1
+            if cell in goals:
+                return store.node(cell)
+
+            self.expanded_nodes += 1
+            queued = len(frontier)
+            cost = store.cost[cell]
+            for i in range(offsets[cell + 1] - 1, offsets[cell] - 1, -1):
+                child = neighbours[i]
+                if child not in store:
+                    store.add(child, cell, codes[i], cost + (costs[child] if costs else 1))
                     frontier.append(child)
 
-            self.visualize(explored, frontier)
+            if self.renderer:
+                self.visualize((store.state(cell),), [store.state(frontier[i]) for i in range(queued, len(frontier))])
 
         return None
     
@@ -76,8 +185,12 @@ class DepthFirstSearch(UninformedSearch):
     """Depth-First Search implementation."""
 
     def search(self):
+        if self.use_compact():
+            return self.search_compact()
+
         frontier = [Node(self.problem.initial)]  # Stack
         explored = set()
+        seen = {self.problem.initial}  # every state ever pushed, for O(1) duplicate checks
 
         while frontier:
             node = frontier.pop()
@@ -87,83 +200,174 @@ class DepthFirstSearch(UninformedSearch):
             if self.is_goal(node):
                 return node
 
+            self.expanded_nodes += 1
+            enqueued = []
             for child in node.expand(self.problem):
-                if child.state not in explored and child not in frontier:
-                # if child.state not in explored:
+                if child.state not in seen:
+                    seen.add(child.state)
                     frontier.append(child)
+                    enqueued.append(child.state)
 
-            self.visualize(explored, frontier)
+            self.visualize((node.state,), enqueued)
+
+        return None
+
+    def search_compact(self):
+        """Same search over cell ids, with nodes kept in a NodeStore."""
+        adjacency = self.problem.adjacency
+        offsets, neighbours, codes = adjacency.offsets, adjacency.neighbours, adjacency.codes
+        store = NodeStore(self.problem)
+        goals = self.goal_cells()
+        costs = getattr(self.problem, 'costs', None)
+
+        start = adjacency.cell(self.problem.initial)
+        store.add(start, ROOT, 0, 0)
+        frontier = [start]
+        explored = 0
+
+        while frontier:
+            cell = frontier.pop()
+            explored += 1
+
+            self.created_nodes = explored + len(frontier) + 1
+            if cell in goals:
+                return store.node(cell)
+
+            self.expanded_nodes += 1
+            queued = len(frontier)
+            cost = store.cost[cell]
+            for i in range(offsets[cell], offsets[cell + 1]):
+                child = neighbours[i]
+                if child not in store:
+                    store.add(child, cell, codes[i], cost + (costs[child] if costs else 1))
+                    frontier.append(child)
+
+            if self.renderer:
+                self.visualize((store.state(cell),), [store.state(c) for c in frontier[queued:]])
 
         return None
     
     def get_name(self):
         return "Depth-First Search"
 
+class UniformCostSearch(UninformedSearch):
+    """Uniform-cost search (Dijkstra) with a bucket queue over the integer path costs."""
+
+    def search(self):
+        problem = self.problem
+        frontier = BucketQueue(getattr(problem, 'max_cost', 1))
+        frontier.push(0, Node(problem.initial))
+        best = {problem.initial: 0} # cheapest known cost of every state reached
+        explored = set()
+
+        while frontier:
+            self.created_nodes = len(best)
+            _, node = frontier.pop()
+            if node.state in explored:
+                continue # a cheaper copy was expanded already
+            explored.add(node.state)
+
+            if self.is_goal(node):
+                return node
+
+            self.expanded_nodes += 1
+            enqueued = []
+            for child in node.expand(problem):
+                if child.path_cost < best.get(child.state, child.path_cost + 1):
+                    best[child.state] = child.path_cost
+                    frontier.push(child.path_cost, child)
+                    enqueued.append(child.state)
+
+            self.visualize((node.state,), enqueued)
+
+        return None
+
+    def get_name(self):
+        return "Uniform-Cost Search"
+
 class AStarSearch(InformedSearch):
     """A* Search implementation."""
 
+    DEEPER_TIES = False # break f(n) ties towards the larger g(n)
+
     def search(self):
-        heuristic = self.manhattan_distance
+        heuristic = self.heuristic = self.make_heuristic()
+        deeper_ties = self.DEEPER_TIES
         
-        frontier = PriorityQueue()
-        frontier.put((0, Node(self.problem.initial)))  # cost, node
+        frontier = IndexedHeap()
+        frontier.push(self.problem.initial, (0, 0) if deeper_ties else 0, Node(self.problem.initial))  # state, f(n), node
         explored = set()
-        g_n_list = {self.problem.initial: 0}  # g(n) for each node state
 
-        while not frontier.empty():
-            frontier_list = [node[1] for node in list(frontier.queue)]
-            _, current_node = frontier.get() # Get the node with the lowest f(n)
+        while frontier:
+            self.created_nodes = len(explored) + len(frontier) + 1
+            _, current_node = frontier.pop() # Get the node with the lowest f(n)
 
-            self.created_nodes = len(explored) + len(frontier_list) + 1
             if self.is_goal(current_node):
                 return current_node
 
             explored.add(current_node.state)
-
-            for child in current_node.expand(self.problem):
-                if child.state in explored or child in frontier_list:
-                    continue
-
-                child_cost = self.problem.path_cost(current_node.path_cost, current_node.state, child.action, child.state)
-                g_n = g_n_list[current_node.state] + child_cost
-                if child.state not in g_n_list or g_n < g_n_list[child.state]:
-                    g_n_list[child.state] = g_n
-                    f_n = g_n + heuristic(child.state)
-                    frontier.put((f_n, child))
-
-            self.visualize(explored, frontier_list)
+            self.expanded_nodes += 1
+
+            children = [child for child in current_node.expand(self.problem) if child.state not in explored]
+            enqueued = []
+            for child, h_n in zip(children, heuristic.batch([child.state for child in children])):
+                # child.path_cost is g(n); a cheaper path to a queued state replaces it
+                f_n = child.path_cost + h_n
+                if deeper_ties:
+                    f_n = (f_n, -child.path_cost)
+                if child.state in frontier:
+                    if frontier.decrease_key(child.state, f_n, child):
+                        enqueued.append(child.state)
+                else:
+                    frontier.push(child.state, f_n, child)
+                    enqueued.append(child.state)
+
+            self.visualize((current_node.state,), enqueued)
 
         return None
     
     def get_name(self):
         return "A* Search"
     
+class ALTSearch(AStarSearch):
+    """A* guided by landmark distance bounds, precomputed once per map."""
+
+    LANDMARKS = 8
+    DEEPER_TIES = True # the bounds are often exact, leaving long runs of equal f(n)
+
+    def make_heuristic(self):
+        landmarks = Landmarks.for_problem(self.problem, self.LANDMARKS)
+        return LandmarkHeuristic(landmarks, self.problem.goal, getattr(self.problem, 'min_cost', 1))
+
+    def get_name(self):
+        return "A* Search with landmarks (ALT)"
+
 class GreedyBestFirstSearch(InformedSearch):
     """Greedy Best-First Search implementation."""
 
     def search(self):
-        heuristic = self.manhattan_distance
+        heuristic = self.heuristic = self.make_heuristic()
 
-        frontier = PriorityQueue()
-        frontier.put((0, Node(self.problem.initial)))
+        frontier = IndexedHeap()
+        frontier.push(self.problem.initial, 0, Node(self.problem.initial))
 
         explored = set()
-        while not frontier.empty():
-            frontier_list = [node[1] for node in list(frontier.queue)]
-            _, current_node = frontier.get() # Get the node with the lowest f(n)
+        while frontier:
+            self.created_nodes = len(explored) + len(frontier) + 1
+            _, current_node = frontier.pop() # Get the node with the lowest f(n)
 
-            self.created_nodes = len(explored) + len(frontier_list) + 1
             if self.is_goal(current_node):
                 return current_node
 
             explored.add(current_node.state)
+            self.expanded_nodes += 1
 
-            for child in current_node.expand(self.problem):
-                if child.state not in explored and child not in frontier_list:
-                    f_n = heuristic(child.state)
-                    frontier.put((f_n, child))
+            children = [child for child in current_node.expand(self.problem)
+                        if child.state not in explored and child.state not in frontier]
+            for child, f_n in zip(children, heuristic.batch([child.state for child in children])):
+                frontier.push(child.state, f_n, child)
             
-            self.visualize(explored, frontier_list)
+            self.visualize((current_node.state,), [child.state for child in children])
 
         return None
     
@@ -174,62 +378,77 @@ class CustomSearch1(UninformedSearch):
     """Bidirectional Breadth-First Search."""
 
     def search(self):
-        goals = [goal for goal in self.problem.goal]
-
-        while goals:
-            goal = goals.pop() # Process each goal 
-            frontier1 = deque([Node(self.problem.initial)])  # Forward frontier
-            frontier2 = deque([Node(goal)])  # Backward frontier
-            explored1 = set()  # Explored states from forward
-            explored2 = set()  # Explored states from backward
-
-            while frontier1 and frontier2:
-                # Expand from forward frontier
-                node1 = frontier1.popleft()
-                explored1.add(node1)
-
-                self.created_nodes = len(explored1) + len(explored2) + len(frontier1) + len(frontier2) + 1
-                for child in node1.expand(self.problem):
-                    for tmp_node in explored2:
-                        if child == tmp_node: # Intersection found
-                            return self._construct_path(child, tmp_node.parent)
-                    if child not in explored1:
-                        frontier1.append(child)
-
-                # Expand from backward frontier
-                node2 = frontier2.popleft()
-                explored2.add(node2)
-
-                for child in node2.expand(self.problem):
-                    # if child in explored1:  # Intersection found
-                    #     return self._construct_path(child, explored1)
-                    if child not in explored2:
-                        frontier2.append(child)
-
-                # Visualization
-                frontier = list(frontier1) + list(frontier2)
-                explored = []
-                for node in explored1:
-                    explored.append(node.state)
-                for node in explored2:
-                    explored.append(node.state)
-                self.visualize(explored, frontier)
+        start = Node(self.problem.initial)
+        self.created_nodes = 1
+        if self.is_goal(start):
+            return start
+
+        # Each side maps state -> node, so a meeting is found in O(1) from either direction
+        forward = {start.state: start}
+        goals = self.problem.goal if isinstance(self.problem.goal, list) else [self.problem.goal]
+        check_possible = getattr(self.problem, 'check_possible', None)
+        if check_possible:
+            # A goal inside a wall can never be entered, so it must not seed the backward side
+            goals = [goal for goal in goals if check_possible(goal)]
+        backward = {goal: Node(goal) for goal in goals}  # all goals start one multi-source search
+
+        frontier1 = deque([start])  # Forward frontier
+        frontier2 = deque(backward.values())  # Backward frontier
+
+        while frontier1 and frontier2:
+            # Expand one whole layer of the smaller frontier
+            if len(frontier1) <= len(frontier2):
+                meeting = self._expand_layer(frontier1, forward, backward)
+                if meeting:
+                    return self._construct_path(meeting[0], meeting[1])
+            else:
+                meeting = self._expand_layer(frontier2, backward, forward)
+                if meeting:
+                    return self._construct_path(meeting[1], meeting[0])
 
         return None  # No solution found
 
-    def _construct_path(self, first_half, second_half):
-        """Constructs the path from initial state to goal state."""
+    def _expand_layer(self, frontier, reached, other):
+        """
+        Expands every node of the current layer of frontier.
+        Returns the (this side, other side) node pair of the shortest meeting found, or None.
+        """
+        best = None
+        for _ in range(len(frontier)):
+            node = frontier.popleft()
+            self.expanded_nodes += 1
+
+            enqueued = []
+            for child in node.expand(self.problem):
+                if child.state in reached:
+                    continue
+                reached[child.state] = child
+                frontier.append(child)
+                enqueued.append(child.state)
+
+                meet = other.get(child.state)
+                if meet and (best is None or child.depth + meet.depth < best[0].depth + best[1].depth):
+                    best = (child, meet)  # Intersection found
+
+            self.created_nodes = len(reached) + len(other)
+            self.visualize((node.state,), enqueued)
 
-        path = [first_half]
+        return best
+
+    def _construct_path(self, first_half, second_half):
+        """
+        Constructs the path from initial state to goal state by replaying the
+        backward half (second_half up to its goal) on top of the forward node.
+        """
+        node = first_half
+        second_half = second_half.parent
         while second_half:
-            parent = second_half.parent
-            previous_node = path[-1]
-            second_half.action = self.reverse_action(second_half.state, previous_node.state)
-            second_half.parent = previous_node
-            path.append(second_half)
-            second_half = parent
+            action = self.reverse_action(second_half.state, node.state)
+            path_cost = self.problem.path_cost(node.path_cost, node.state, action, second_half.state)
+            node = Node(second_half.state, node, action, path_cost)
+            second_half = second_half.parent
 
-        return path[-1]
+        return node
 
     def reverse_action(self, first, second):
         x1, y1 = first
@@ -256,36 +475,282 @@ class CustomSearch2(InformedSearch):
     """Beam Search implementation."""
 
     def search(self):
-        heuristic = self.manhattan_distance
+        heuristic = self.heuristic = self.make_heuristic()
         beam_width = 2
 
-        frontier = PriorityQueue()
-        frontier.put((0, Node(self.problem.initial)))
+        frontier = IndexedHeap()
+        frontier.push(self.problem.initial, 0, Node(self.problem.initial))
         explored = set()
 
-        while not frontier.empty():
-            frontier_list = [node[1] for node in list(frontier.queue)]
-            _, current_node = frontier.get()
+        while frontier:
+            self.created_nodes = len(explored) + len(frontier) + 1
+            _, current_node = frontier.pop()
 
-            self.created_nodes = len(explored) + len(frontier_list) + 1
             if self.is_goal(current_node):
                 return current_node
 
             explored.add(current_node.state)
+            self.expanded_nodes += 1
 
             children = []
             for child in current_node.expand(self.problem):
-                if child.state not in explored and child not in frontier_list:
+                if child.state not in explored and child.state not in frontier:
                     children.append(child)
 
-            children.sort(key=lambda x: heuristic(x.state))
-            for child in children[:beam_width]:
-                frontier.put((heuristic(child.state), child))
+            # Score all children in one call, then keep the best beam_width of them
+            scored = sorted(zip(heuristic.batch([child.state for child in children]), range(len(children))))
+            for h_n, index in scored[:beam_width]:
+                frontier.push(children[index].state, h_n, children[index])
 
-            self.visualize(explored, frontier_list)
+            self.visualize((current_node.state,), [children[index].state for _, index in scored[:beam_width]])
 
         return None
 
 
     def get_name(self):
-        return "CUS2"
\ No newline at end of file
+        return "CUS2"
+
+
+class JumpPointSearch(InformedSearch):
+    """
+    Jump Point Search for 4-connected grids with uniform step costs.
+
+    A* over jump points only: straight runs of cells without forced neighbours are
+    skipped in one jump, so open areas cost a handful of expansions. Moving vertically
+    also scans sideways at every cell, as in the 4-connected variant of JPS. The jump
+    points are expanded into a step-by-step Node path, as long as A*'s. Jumps skip the
+    cost of the cells they cross, so maps with terrain costs are searched with A*.
+    """
+
+    DIRECTIONS = {(1, 0): 'right', (0, 1): 'down', (-1, 0): 'left', (0, -1): 'up'}
+
+    def search(self):
+        if self.is_weighted():
+            return self.delegate(AStarSearch)
+        heuristic = self.heuristic = self.make_heuristic()
+        self.walkable = self.problem.check_possible
+        goals = self.problem.goal if isinstance(self.problem.goal, list) else [self.problem.goal]
+        self.goals = set(goals)
+
+        start = Node(self.problem.initial)
+        frontier = IndexedHeap()
+        frontier.push(start.state, (0, 0), start)
+        explored = set()
+
+        while frontier:
+            self.created_nodes = len(explored) + len(frontier) + 1
+            _, current_node = frontier.pop()
+
+            if self.is_goal(current_node):
+                return self._expand_path(current_node)
+
+            explored.add(current_node.state)
+            self.expanded_nodes += 1
+
+            children = []
+            x, y = current_node.state
+            for dx, dy in self._directions(current_node):
+                jump_point = self._jump(x, y, dx, dy)
+                if jump_point and jump_point not in explored:
+                    # Jumps are straight lines, so their cost is the number of cells crossed
+                    g_n = current_node.path_cost + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+                    children.append(Node(jump_point, current_node, (self.DIRECTIONS[(dx, dy)], jump_point), g_n))
+
+            enqueued = []
+            for child, h_n in zip(children, heuristic.batch([child.state for child in children])):
+                # Among equal f(n), prefer the deeper jump point: on open floors that avoids
+                # expanding every tied cell
+                f_n = (child.path_cost + h_n, -child.path_cost)
+                if child.state in frontier:
+                    frontier.decrease_key(child.state, f_n, child)
+                else:
+                    frontier.push(child.state, f_n, child)
+                    enqueued.append(child.state)
+
+            self.visualize((current_node.state,), enqueued)
+
+        return None
+
+    def _directions(self, node):
+        """Returns the pruned directions to scan from node, given the direction it was reached from."""
+        walkable = self.walkable
+        x, y = node.state
+        if node.parent is None:
+            return [move for move in self.DIRECTIONS if walkable((x + move[0], y + move[1]))]
+
+        px, py = node.parent.state
+        dx, dy = (x > px) - (x < px), (y > py) - (y < py)
+        if dx:
+            candidates = [(0, -1), (0, 1), (dx, 0)]
+        else:
+            candidates = [(-1, 0), (1, 0), (0, dy)]
+        return [move for move in candidates if walkable((x + move[0], y + move[1]))]
+
+    def _jump(self, x, y, dx, dy):
+        """Scans from (x, y) in direction (dx, dy); returns the next jump point or None."""
+        walkable, goals = self.walkable, self.goals
+        while True:
+            x, y = x + dx, y + dy
+            if not walkable((x, y)):
+                return None
+            if (x, y) in goals:
+                return (x, y)
+
+            if dx:
+                # A free cell above or below that is blocked behind us is a forced neighbour
+                if (walkable((x, y - 1)) and not walkable((x - dx, y - 1))) or \
+                   (walkable((x, y + 1)) and not walkable((x - dx, y + 1))):
+                    return (x, y)
+            else:
+                if (walkable((x - 1, y)) and not walkable((x - 1, y - dy))) or \
+                   (walkable((x + 1, y)) and not walkable((x + 1, y - dy))):
+                    return (x, y)
+                # Moving vertically, any horizontal jump point makes this cell a jump point
+                if self._jump(x, y, 1, 0) or self._jump(x, y, -1, 0):
+                    return (x, y)
+
+    def _expand_path(self, node):
+        """Turns a chain of jump point nodes into a chain of single-step nodes."""
+        jump_points = [n.state for n in node.path()]
+        current = Node(jump_points[0])
+        for (x1, y1), (x2, y2) in zip(jump_points, jump_points[1:]):
+            dx, dy = (x2 > x1) - (x2 < x1), (y2 > y1) - (y2 < y1)
+            name = self.DIRECTIONS[(dx, dy)]
+            x, y = x1, y1
+            while (x, y) != (x2, y2):
+                x, y = x + dx, y + dy
+                current = current.child_node(self.problem, (name, (x, y)))
+        return current
+
+    def get_name(self):
+        return "Jump Point Search"
+
+class DStarLiteSearch(InformedSearch):
+    """
+    D* Lite: incremental replanning when walls change.
+
+    The search runs backwards from every goal, so g(s) is the cost from s to the
+    nearest goal. After add_wall / remove_wall (or problem edits reported through
+    notify) the next search() call repairs only the states whose costs changed,
+    and move_to() lets the start follow the robot without discarding that work.
+    """
+
+    def __init__(self, problem, renderer=None, compact=False):
+        super().__init__(problem, renderer, compact)
+        self.start = problem.initial
+        self.last = problem.initial # start when km was last updated
+        self.km = 0 # heuristic offset accumulated by start moves
+        self.g = {}
+        self.rhs = {}
+        self.frontier = None # IndexedHeap of inconsistent states, created by the first search
+        self.min_cost = getattr(problem, 'min_cost', 1)
+
+    def h(self, state):
+        # Manhattan distance from the start, the direction the backward search heads
+        return (abs(state[0] - self.start[0]) + abs(state[1] - self.start[1])) * self.min_cost
+
+    def key(self, state):
+        value = min(self.g.get(state, INFINITY), self.rhs.get(state, INFINITY))
+        return (value + self.h(state) + self.km, value)
+
+    def neighbours(self, state):
+        """Returns the in-grid 4-neighbours of state; moves between free cells are symmetric."""
+        x, y = state
+        problem = self.problem
+        return [(nx, ny) for nx, ny in ((x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1))
+                if 0 <= nx < problem.width and 0 <= ny < problem.height]
+
+    def update(self, state):
+        """Recomputes rhs(state) from its successors and requeues it if it is inconsistent."""
+        problem, g = self.problem, self.g
+        if not problem.check_possible(state):
+            rhs = INFINITY
+        elif problem.goal_test(state):
+            rhs = 0
+        else:
+            rhs = min((problem.path_cost(0, state, None, child) + g.get(child, INFINITY)
+                       for child in self.neighbours(state) if problem.check_possible(child)), default=INFINITY)
+        self.rhs[state] = rhs
+
+        frontier = self.frontier
+        if state in frontier:
+            frontier.remove(state)
+        if g.get(state, INFINITY) != rhs:
+            frontier.push(state, self.key(state), state)
+            return True
+        return False
+
+    def compute(self):
+        """Processes inconsistent states until the start is consistent and has its final cost."""
+        frontier, g, rhs = self.frontier, self.g, self.rhs
+        start = self.start
+        expanded = 0
+        while frontier and (frontier.peek()[0] < self.key(start) or rhs.get(start, INFINITY) != g.get(start, INFINITY)):
+            old_key, state = frontier.pop()
+            new_key = self.key(state)
+            if old_key < new_key:
+                frontier.push(state, new_key, state)
+                continue
+
+            expanded += 1
+            self.expanded_nodes += 1
+            if g.get(state, INFINITY) > rhs[state]:
+                g[state] = rhs[state] # overconsistent: lower g, predecessors may get cheaper
+                affected = self.neighbours(state)
+            else:
+                g[state] = INFINITY # underconsistent: raise g, re-evaluate state and predecessors
+                affected = self.neighbours(state) + [state]
+            enqueued = [other for other in affected if self.update(other)]
+            self.visualize((state,), enqueued)
+        self.created_nodes = expanded + len(frontier) + 1
+
+    def search(self):
+        problem = self.problem
+        if self.frontier is None:
+            self.frontier = IndexedHeap()
+            goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+            for goal in goals:
+                self.update(goal)
+        self.compute()
+        return self.path()
+
+    def path(self):
+        """Follows the cheapest successors from the start to a goal, or returns None."""
+        problem, g = self.problem, self.g
+        if self.rhs.get(self.start, g.get(self.start, INFINITY)) == INFINITY:
+            return None
+        node = Node(self.start)
+        while not problem.goal_test(node.state):
+            best = None
+            for action in problem.actions(node.state):
+                cost = problem.path_cost(0, node.state, action, action[1]) + g.get(action[1], INFINITY)
+                if best is None or cost < best[0]:
+                    best = (cost, action)
+            if best is None or best[0] == INFINITY or node.depth > problem.width * problem.height:
+                return None
+            node = node.child_node(problem, best[1])
+        return node
+
+    def notify(self, states):
+        """Reports cells whose wall status changed; the next search() repairs the plan around them."""
+        if self.frontier is None:
+            return
+        for state in states:
+            for other in [state] + self.neighbours(state):
+                self.update(other)
+
+    def add_wall(self, state):
+        if self.problem.add_wall(state):
+            self.notify([state])
+
+    def remove_wall(self, state):
+        if self.problem.remove_wall(state):
+            self.notify([state])
+
+    def move_to(self, state):
+        """Moves the start, e.g. after the robot took a step along the path."""
+        self.km += (abs(state[0] - self.last[0]) + abs(state[1] - self.last[1])) * self.min_cost
+        self.last = self.start = state
+
+    def get_name(self):
+        return "D* Lite"
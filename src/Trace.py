@@ -0,0 +1,267 @@
+"""
+Binary search traces.
+
+Layout (little-endian):
+    header      HEADER: magic, version, flags, width, height, initial cell, goal count, reserved
+    goals       goal count x uint32 cell ids
+    occupancy   bit-packed walls, (width*height+7)//8 bytes, zero-padded to a multiple of 4
+    body        uint32 words, zlib-compressed when flags & COMPRESSED:
+                  step:  (explored << 20 | enqueued << 10 | dequeued) followed by that many cell ids
+                  END, created nodes, path length (NO_PATH if none), path cell ids
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from Adjacency import ACTIONS, MOVES, Adjacency
+from GridParser import pack_bits, unpack_bits
+from Node import Node
+
+MAGIC = b"RNTR"
+VERSION = 1
+COMPRESSED = 1
+HEADER = struct.Struct("<4sHHIIIII")
+END = 0xFFFFFFFF
+NO_PATH = 0xFFFFFFFF
+MAX_COUNT = 1023 # largest count a step word can hold; bigger steps are split
+FLUSH_WORDS = 1 << 16
+
+class TraceRecorder:
+    """
+    Renderer that writes the search events to a trace file, optionally forwarding
+    them to another renderer. Call finish() with the result once the search ends.
+    """
+
+    def __init__(self, filename, problem, compress=False, renderer=None):
+        self.width = problem.width
+        self.height = problem.height
+        self.renderer = renderer
+        self.words = array('I')
+        self.compressor = zlib.compressobj() if compress else None
+        self.file = open(filename, "wb")
+
+        goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+        goal_cells = [cell for cell in map(self.cell, goals) if cell is not None]
+        initial = self.cell(problem.initial)
+        self.file.write(HEADER.pack(MAGIC, VERSION, COMPRESSED if compress else 0, self.width, self.height,
+                                    END if initial is None else initial, len(goal_cells), 0))
+        self.file.write(self.to_bytes(array('I', goal_cells)))
+        occupancy = pack_bits(problem.grid)
+        self.file.write(occupancy + bytes(-len(occupancy) % 4))
+
+    def cell(self, state):
+        x, y = state
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    def to_bytes(self, words):
+        if sys.byteorder != 'little':
+            words = array('I', words)
+            words.byteswap()
+        return words.tobytes()
+
+    def render(self, explored=(), enqueued=(), dequeued=()):
+        if self.renderer:
+            self.renderer.render(explored, enqueued, dequeued)
+
+        width, height = self.width, self.height
+        explored = [y * width + x for x, y in explored if 0 <= x < width and 0 <= y < height]
+        enqueued = [y * width + x for x, y in enqueued if 0 <= x < width and 0 <= y < height]
+        dequeued = [y * width + x for x, y in dequeued if 0 <= x < width and 0 <= y < height]
+        words = self.words
+        while len(explored) > MAX_COUNT or len(enqueued) > MAX_COUNT or len(dequeued) > MAX_COUNT:
+            step = (explored[:MAX_COUNT], enqueued[:MAX_COUNT], dequeued[:MAX_COUNT])
+            words.append(len(step[0]) << 20 | len(step[1]) << 10 | len(step[2]))
+            for cells in step:
+                words.extend(cells)
+            explored, enqueued, dequeued = explored[MAX_COUNT:], enqueued[MAX_COUNT:], dequeued[MAX_COUNT:]
+        words.append(len(explored) << 20 | len(enqueued) << 10 | len(dequeued))
+        words.extend(explored)
+        words.extend(enqueued)
+        words.extend(dequeued)
+
+        if len(words) >= FLUSH_WORDS:
+            self.flush()
+
+    def flush(self):
+        data = self.to_bytes(self.words)
+        self.words = array('I')
+        if self.compressor:
+            data = self.compressor.compress(data)
+        self.file.write(data)
+
+    def finish(self, node, created_nodes):
+        """Writes the result of the search and closes the file."""
+        words = self.words
+        words.extend((END, created_nodes))
+        if node is None:
+            words.append(NO_PATH)
+        else:
+            path = [self.cell(n.state) for n in node.path()]
+            words.append(len(path))
+            words.extend(path)
+        self.flush()
+        if self.compressor:
+            self.file.write(self.compressor.flush())
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+class TraceReader:
+    """
+    Reads a trace file. Uncompressed traces are memory-mapped, so opening one is
+    O(map size) regardless of the trace length; events are decoded while iterating.
+
+    Also exposes the GridParser attributes, so RobotNavigation(reader) rebuilds the map.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, "rb") as file:
+            data = file.read(HEADER.size)
+            magic, version, flags, width, height, initial, goal_count, _ = HEADER.unpack(data)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(filename + " is not a version {} search trace".format(VERSION))
+            goals = self.from_bytes(file.read(4 * goal_count))
+            occupancy_size = (width * height + 7) // 8
+            occupancy = file.read(occupancy_size)
+            offset = HEADER.size + 4 * goal_count + occupancy_size + (-occupancy_size % 4)
+
+            self.mmap = None
+            self.views = [] # memoryviews over the mmap, released by close()
+            if flags & COMPRESSED:
+                file.seek(offset)
+                self.words = self.from_bytes(zlib.decompress(file.read()))
+            else:
+                self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                body = memoryview(self.mmap)[offset:]
+                if sys.byteorder == 'little':
+                    self.views = [body, body.cast('I')]
+                    self.words = self.views[-1]
+                else:
+                    self.words = self.from_bytes(body)
+                    body.release()
+
+        self.compressed = bool(flags & COMPRESSED)
+        self.grid_w = width
+        self.grid_h = height
+        self.initial = self.state(initial) if initial != END else None
+        self.goals = [self.state(cell) for cell in goals]
+        self.grid = unpack_bits(occupancy, width * height)
+        self._walls = None
+        self._adjacency = None
+        self._result = None
+
+    def from_bytes(self, data):
+        words = array('I')
+        words.frombytes(data)
+        if sys.byteorder != 'little':
+            words.byteswap()
+        return words
+
+    def state(self, cell):
+        y, x = divmod(cell, self.grid_w)
+        return (x, y)
+
+    @property
+    def walls(self):
+        if self._walls is None:
+            grid, state = self.grid, self.state
+            self._walls = [state(cell) for cell in range(len(grid)) if grid[cell]]
+        return self._walls
+
+    def adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = Adjacency(self.grid_w, self.grid_h, self.grid)
+        return self._adjacency
+
+    def steps(self):
+        """Yields (explored, enqueued, dequeued) cell id lists for every recorded step."""
+        words = self.words
+        i = 0
+        while True:
+            word = words[i]
+            if word == END:
+                self._read_result(i + 1)
+                return
+            explored, enqueued, dequeued = word >> 20, (word >> 10) & MAX_COUNT, word & MAX_COUNT
+            i += 1
+            yield (list(words[i:i + explored]), list(words[i + explored:i + explored + enqueued]),
+                   list(words[i + explored + enqueued:i + explored + enqueued + dequeued]))
+            i += explored + enqueued + dequeued
+
+    def events(self, problem):
+        """Yields the trace as EventQueue events: ("step", states...) tuples, then ("done", node)."""
+        state = self.state
+        for explored, enqueued, dequeued in self.steps():
+            yield ("step", [state(c) for c in explored], [state(c) for c in enqueued], [state(c) for c in dequeued])
+        yield ("done", self.node(problem))
+
+    def result(self):
+        """Returns (created nodes, path cell ids or None), scanning the trace if needed."""
+        if self._result is None:
+            for _ in self.steps():
+                pass
+        return self._result
+
+    def _read_result(self, i):
+        words = self.words
+        created_nodes, length = words[i], words[i + 1]
+        path = None if length == NO_PATH else list(words[i + 2:i + 2 + length])
+        self._result = (created_nodes, path)
+
+    def node(self, problem):
+        """
+        Rebuilds the recorded path as a Node chain priced by problem.path_cost (the trace
+        keeps no terrain costs), or returns None if no goal was found.
+        """
+        path = self.result()[1]
+        if not path:
+            return None
+        node = Node(self.state(path[0]))
+        for cell in path[1:]:
+            x, y = self.state(cell)
+            move = (x - node.state[0], y - node.state[1])
+            node = node.child_node(problem, (ACTIONS[MOVES.index(move)], (x, y)))
+        return node
+
+    def statistics(self):
+        """Returns summary statistics of the recorded search."""
+        steps = explored = enqueued = dequeued = 0
+        frontier = max_frontier = 1 # the initial node
+        for step in self.steps():
+            steps += 1
+            explored += len(step[0])
+            enqueued += len(step[1])
+            dequeued += len(step[2])
+            frontier += len(step[1]) - len(step[0]) - len(step[2])
+            max_frontier = max(max_frontier, frontier)
+
+        created_nodes, path = self.result()
+        return {
+            "trace": self.filename,
+            "width": self.grid_w,
+            "height": self.grid_h,
+            "compressed": self.compressed,
+            "steps": steps,
+            "explored": explored,
+            "enqueued": enqueued,
+            "dequeued": dequeued,
+            "max_frontier": max_frontier,
+            "created_nodes": created_nodes,
+            "path_length": len(path) - 1 if path else None,
+        }
+
+    def close(self):
+        self.words = None
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        if self.mmap:
+            self.mmap.close()
+            self.mmap = None
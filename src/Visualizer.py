@@ -2,6 +2,9 @@ import tkinter as tk
 import time
 
 class Visualizer(tk.Canvas):
+    FRAME_RATE = 30 # frames per second when playing events from a search thread
+    FRAME_BUDGET = 0.6 # share of each frame spent applying events, the rest keeps Tk responsive
+
     def __init__(self, master, problem, size, speed):
         width = problem.width
         height = problem.height
@@ -11,8 +14,18 @@ class Visualizer(tk.Canvas):
         self.problem = problem
         self.agent = None
         self.cells = {}
+        self.fills = {} # state -> fill colour currently drawn, so unchanged cells are skipped
+        goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+        self.fixed = set(goals) | {problem.initial} # cells the search events never recolour
         self.draw_grid()
         self.draw_walls()
+        self.draw_initial()
+        self.draw_goal()
+        self.draw_agent(problem.initial)
+        self.events = None
+        self.on_finish = None
+        self.pending = None # id of the scheduled drain/animation callback
+        self.paused = False
 
     def get_cell_dim(self, state):
         x, y = state
@@ -23,6 +36,11 @@ class Visualizer(tk.Canvas):
         return x1, y1, x2, y2
 
     def draw_cell(self, state, **args):
+        fill = args.get("fill")
+        if fill is not None:
+            if self.fills.get(state) == fill:
+                return
+            self.fills[state] = fill
         if state not in self.cells:
             x1, y1, x2, y2 = self.get_cell_dim(state)
             cid = self.create_rectangle(x1, y1, x2, y2, args)
@@ -58,21 +76,92 @@ class Visualizer(tk.Canvas):
     def draw_frontier(self, state):
         self.draw_cell(state, fill="yellow")
 
-    def render(self, explored = [], frontier = [], found_path = None):
-        time.sleep(self.delay) # Delay between steps in algorithm
-        for state in explored: self.draw_explored(state)
-        for node in frontier: self.draw_frontier(node.state)
+    def draw_empty(self, state):
+        self.draw_cell(state, fill="white")
 
-        self.draw_initial()
-        self.draw_agent(self.problem.initial)
-
-        if found_path:
-            for action in found_path.solution():
-                state = self.problem.result(found_path.state, action)
-                self.draw_cell(state, fill="aqua")
-                self.draw_agent(state)
-                time.sleep(self.delay)
-                self.update()
-                
-        self.draw_goal()
-        self.update()
\ No newline at end of file
+    def apply(self, explored = (), enqueued = (), dequeued = ()):
+        """Draws one step's changes without waiting or updating the window."""
+        fixed = self.fixed
+        for state in dequeued:
+            if state not in fixed: self.draw_empty(state)
+        for state in explored:
+            if state not in fixed: self.draw_explored(state)
+        for state in enqueued:
+            if state not in fixed: self.draw_frontier(state)
+
+    def play(self, events, on_finish = None):
+        """
+        Starts draining an EventQueue filled by a search thread from the Tk main loop.
+        Each frame applies as many steps as the speed setting allows (all pending
+        steps when speed is 0) within the frame budget; on_finish(node) is called
+        once the found path has been animated.
+        """
+        self.events = events
+        self.on_finish = on_finish
+        self.pending = self.after(0, self.drain)
+
+    def stop(self):
+        """Cancels the scheduled drain or animation, e.g. before the window is destroyed."""
+        if self.pending:
+            self.after_cancel(self.pending)
+            self.pending = None
+
+    def step(self):
+        """Applies a single pending event, e.g. to step through a paused replay."""
+        event = self.events.get_nowait() if self.events else None
+        if event is None:
+            return
+        if event[0] == "done":
+            self.stop()
+            self.animate_path(event[1])
+        else:
+            self.apply(*event[1:])
+
+    def drain(self):
+        frame = 1.0 / self.FRAME_RATE
+        if self.paused:
+            self.pending = self.after(int(frame * 1000), self.drain)
+            return
+
+        deadline = time.perf_counter() + frame * self.FRAME_BUDGET
+        # speed is seconds per step, so a frame may hold frame / speed steps
+        steps = max(1, round(frame / self.delay)) if self.delay > 0 else None
+
+        while steps is None or steps > 0:
+            event = self.events.get_nowait()
+            if event is None:
+                break
+            if event[0] == "done":
+                self.animate_path(event[1])
+                return
+            self.apply(*event[1:])
+            if steps is not None:
+                steps -= 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.pending = self.after(int(frame * 1000), self.drain)
+
+    def animate_path(self, node, actions = None):
+        """Animates the agent along the found path, one cell per frame or per speed delay."""
+        if node is None:
+            self.finish(node)
+            return
+        if actions is None:
+            actions = iter(node.solution())
+        action = next(actions, None)
+        if action is None:
+            self.draw_goal()
+            self.finish(node)
+            return
+
+        state = self.problem.result(node.state, action)
+        self.draw_cell(state, fill="aqua")
+        self.draw_agent(state)
+        delay = max(self.delay, 1.0 / self.FRAME_RATE)
+        self.pending = self.after(int(delay * 1000), self.animate_path, node, actions)
+
+    def finish(self, node):
+        self.pending = None
+        if self.on_finish:
+            self.on_finish(node)
@@ -0,0 +1,140 @@
+"""
+Vectorized wavefront (multi-source BFS) over the whole occupancy grid.
+
+Each step expands the entire frontier at once: the frontier mask is shifted one
+cell in each of the four directions and masked with the free, unvisited cells.
+Only the bounding box of the frontier (plus a one-cell margin) is touched per step.
+Requires NumPy.
+"""
+
+from Adjacency import ACTIONS, MOVES
+from Landmarks import UNREACHABLE
+from Node import Node
+from SearchStrategy import UniformCostSearch, UninformedSearch
+
+NO_DIRECTION = 255
+
+class Wavefront:
+    """
+    Distance and direction fields from a set of source cells.
+
+    After compute(sources), distances[y, x] is the number of steps from (x, y) to the
+    nearest source (UNREACHABLE if none), and directions[y, x] the index into ACTIONS
+    of the move that takes (x, y) one step closer to it (NO_DIRECTION on sources and
+    unreached cells).
+    """
+
+    def __init__(self, width, height, grid):
+        import numpy as np
+
+        self.np = np
+        self.width = width
+        self.height = height
+        self.free = (np.frombuffer(bytes(grid), dtype=np.uint8) == 0).reshape(height, width)
+        self.distances = None
+        self.directions = None
+        self.expanded = 0 # frontier cells whose neighbours were examined by the last compute()
+
+    def compute(self, sources, target=None, visit=None):
+        """
+        Fills distances and directions from the (x, y) sources and returns them.
+
+        Stops early once the target state is reached, if given. visit, if given, is
+        called with the (x, y) states of every new wavefront level.
+        """
+        np = self.np
+        width, height, free = self.width, self.height, self.free
+        distances = self.distances = np.full((height, width), UNREACHABLE, dtype=np.uint32)
+        directions = self.directions = np.full((height, width), NO_DIRECTION, dtype=np.uint8)
+        unvisited = free.copy()
+        self.expanded = 0
+
+        sources = [(x, y) for x, y in sources if 0 <= x < width and 0 <= y < height and free[y, x]]
+        if not sources:
+            return distances, directions
+        xs = np.array([x for x, _ in sources])
+        ys = np.array([y for _, y in sources])
+        distances[ys, xs] = 0
+        unvisited[ys, xs] = False
+        if visit:
+            visit(sources)
+
+        # frontier is a boolean mask of the window [top:bottom, left:right]
+        top, bottom, left, right = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        frontier = np.zeros((bottom - top, right - left), dtype=bool)
+        frontier[ys - top, xs - left] = True
+        level = 0
+        while target is None or distances[target[1], target[0]] == UNREACHABLE:
+            level += 1
+            self.expanded += int(frontier.sum())
+            # grow the window by one cell where the grid allows
+            y0, y1, x0, x1 = max(top - 1, 0), min(bottom + 1, height), max(left - 1, 0), min(right + 1, width)
+            current = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+            current[top - y0:bottom - y0, left - x0:right - x0] = frontier
+            open_cells = unvisited[y0:y1, x0:x1]
+
+            reached = []
+            for dx, dy in MOVES:
+                # cells whose neighbour at (+dx, +dy) is on the frontier
+                shifted = np.zeros_like(current)
+                shifted[max(-dy, 0):current.shape[0] - max(dy, 0), max(-dx, 0):current.shape[1] - max(dx, 0)] = \
+                    current[max(dy, 0):current.shape[0] - max(-dy, 0), max(dx, 0):current.shape[1] - max(-dx, 0)]
+                reached.append(shifted)
+            new = (reached[0] | reached[1] | reached[2] | reached[3]) & open_cells
+
+            # when several moves lead to the frontier, the first one in ACTIONS order wins
+            window_directions = directions[y0:y1, x0:x1]
+            for code in range(len(MOVES) - 1, -1, -1):
+                window_directions[reached[code] & new] = code
+
+            rows, cols = np.nonzero(new)
+            if not len(rows):
+                break
+            distances[y0:y1, x0:x1][new] = level
+            open_cells &= ~new
+            if visit:
+                visit(list(zip((cols + x0).tolist(), (rows + y0).tolist())))
+
+            top, bottom, left, right = y0 + rows.min(), y0 + rows.max() + 1, x0 + cols.min(), x0 + cols.max() + 1
+            frontier = new[top - y0:bottom - y0, left - x0:right - x0]
+
+        return distances, directions
+
+    def path(self, start, problem):
+        """
+        Follows the directions from start to the nearest source and returns the Node chain,
+        priced by problem.path_cost, or None.
+        """
+        x, y = start
+        if not (0 <= x < self.width and 0 <= y < self.height) or self.distances[y, x] == UNREACHABLE:
+            return None
+        directions = self.directions
+        node = Node(start)
+        code = directions[y, x]
+        while code != NO_DIRECTION:
+            dx, dy = MOVES[code]
+            x, y = x + dx, y + dy
+            node = node.child_node(problem, (ACTIONS[code], (x, y)))
+            code = directions[y, x]
+        return node
+
+class WavefrontSearch(UninformedSearch):
+    """
+    Breadth-first wavefront from the goals, stopped once it reaches the initial state.
+    Levels count steps, not terrain costs, so weighted maps are searched with UCS.
+    """
+
+    def search(self):
+        if self.is_weighted():
+            return self.delegate(UniformCostSearch)
+        problem = self.problem
+        wavefront = Wavefront(problem.width, problem.height, problem.grid)
+        goals = problem.goal if isinstance(problem.goal, list) else [problem.goal]
+        visit = (lambda states: self.visualize(states)) if self.renderer else None
+        distances, _ = wavefront.compute(goals, problem.initial if problem.check_possible(problem.initial) else None, visit)
+        self.created_nodes = int((distances != UNREACHABLE).sum())
+        self.expanded_nodes += wavefront.expanded
+        return wavefront.path(problem.initial, problem)
+
+    def get_name(self):
+        return "Wavefront (vectorized BFS)"
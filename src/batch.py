@@ -0,0 +1,116 @@
+"""
+Parallel batch solver over many map files and methods.
+
+    python batch.py "maps/*.txt" [more globs...] --methods bfs,astar [--workers 8] [--format jsonl|csv] [--out results.jsonl]
+
+Each map is parsed once in a worker process and solved with every method. Results
+are written as soon as each map finishes, in completion order, one row per
+map x method with its own timing.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from MapFile import load_map
+from Problem import create_problem
+from search import METHODS, solve
+
+FIELDS = ["map", "method", "parse_time", "time", "created_nodes", "path_length", "path", "error"]
+
+def solve_map(filename, methods):
+    """Parses one map and solves it with each method. Runs in a worker process."""
+    start = time.perf_counter()
+    try:
+        problem = create_problem(load_map(filename))
+    except Exception as error:
+        return [{"map": filename, "method": method, "error": repr(error)} for method in methods]
+    parse_time = time.perf_counter() - start
+
+    results = []
+    for method in methods:
+        result = {"map": filename, "method": method, "parse_time": parse_time}
+        try:
+            start = time.perf_counter()
+            strategy, node = solve(problem, method)
+            result["time"] = time.perf_counter() - start
+            result["created_nodes"] = strategy.get_created_nodes()
+            path = [action[0] for action in node.solution()] if node else None
+            result["path_length"] = len(path) if path is not None else None
+            result["path"] = path
+        except Exception as error:
+            result["error"] = repr(error)
+        results.append(result)
+    return results
+
+def expand_globs(patterns):
+    """Returns the sorted, de-duplicated files matched by the glob patterns."""
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        if not matches:
+            print("warning: no map files match " + pattern, file=sys.stderr)
+        files.update(matches)
+    return sorted(files)
+
+class JsonLinesWriter:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, result):
+        self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+class CsvWriter:
+    def __init__(self, file):
+        self.file = file
+        self.writer = csv.DictWriter(file, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        row = dict(result)
+        if row.get("path") is not None:
+            row["path"] = " ".join(row["path"])
+        self.writer.writerow(row)
+        self.file.flush()
+
+def run_batch(files, methods, writer, workers=None):
+    """Fans the maps out over a process pool and writes results in completion order."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(solve_map, filename, methods) for filename in files]
+        for future in as_completed(futures):
+            for result in future.result():
+                writer.write(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve many map files with many methods in parallel.")
+    parser.add_argument("patterns", nargs="+", help="map files or glob patterns")
+    parser.add_argument("--methods", default=",".join(METHODS), help="comma-separated methods")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    parser.add_argument("--out", default="-", help="output file, or - for stdout")
+    args = parser.parse_args()
+
+    methods = args.methods.split(",")
+    for method in methods:
+        if method not in METHODS:
+            parser.error("unknown method: " + method)
+
+    files = expand_globs(args.patterns)
+    if not files:
+        parser.error("no map files matched")
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", newline="")
+    try:
+        writer = JsonLinesWriter(out) if args.format == "jsonl" else CsvWriter(out)
+        run_batch(files, methods, writer, args.workers)
+    finally:
+        if out is not sys.stdout:
+            out.close()
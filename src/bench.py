@@ -0,0 +1,151 @@
+"""
+Benchmark harness for the search strategies.
+
+Runs every method over the bundled maps and seeded mapgen maps of several kinds,
+sizes and wall densities, and writes the measurements to JSON:
+
+    python bench.py run [--out results.json] [--methods bfs,astar] [--kinds rects,maze,rooms]
+                        [--sizes 100,300] [--densities 0.1,0.3] [--seed 0]
+    python bench.py compare results.json baseline.json [--threshold 0.25]
+
+compare exits with status 1 if any result regressed against the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from GridParser import GridParser
+from Problem import RobotNavigation
+from mapgen import KINDS, generate, write_map
+from search import METHODS, create_strategy
+
+BUNDLED_MAPS = ["1.txt", "2.txt", "3.txt", "4.txt", "5.txt", "RobotNav-test.txt"]
+
+def measure(problem, method, repeat):
+    """Returns the statistics of one method on one problem."""
+    # Timed runs, without tracing or counting overhead
+    best = None
+    for _ in range(repeat):
+        strategy = create_strategy(method, problem)
+        start = time.perf_counter()
+        node = strategy.search()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Every strategy counts its own expansions; one traced run for peak memory
+    expansions = strategy.get_expanded_nodes()
+    tracemalloc.start()
+    try:
+        create_strategy(method, problem).search()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "time": best,
+        "expansions": expansions,
+        "expansions_per_sec": expansions / best if best > 0 else None,
+        "created_nodes": strategy.get_created_nodes(),
+        "path_length": len(node.solution()) if node else None,
+        "peak_memory": peak,
+    }
+
+def run(args):
+    methods = args.methods.split(",")
+    maps = [(name, name) for name in args.maps.split(",") if name]
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    densities = [float(density) for density in args.densities.split(",") if density]
+    for kind in (kind for kind in args.kinds.split(",") if kind):
+        for size in (int(size) for size in args.sizes.split(",") if size):
+            # only the random rectangles have a wall density
+            for density in densities if kind == "rects" else [None]:
+                options = {"density": density} if density is not None else {}
+                key = "{}-{}x{}{}-s{}".format(kind, size, size, "-d{}".format(density) if options else "", args.seed)
+                filename = os.path.join(workdir, key + ".txt")
+                write_map(filename, size, size, *generate(kind, size, size, args.seed, **options))
+                maps.append((key, filename))
+
+    results = []
+    for key, filename in maps:
+        problem = RobotNavigation(GridParser(filename))
+        for method in methods:
+            result = {"map": key, "method": method}
+            result.update(measure(problem, method, args.repeat))
+            results.append(result)
+            print("{:<28} {:<6} {:>9.4f}s {:>10} created  path {}".format(
+                key, method, result["time"], result["created_nodes"], result["path_length"]), file=sys.stderr)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as file:
+        json.dump(report, file, indent=2)
+    print("wrote", args.out, file=sys.stderr)
+
+def compare(args):
+    with open(args.results) as file:
+        current = {(r["map"], r["method"]): r for r in json.load(file)["results"]}
+    with open(args.baseline) as file:
+        baseline = {(r["map"], r["method"]): r for r in json.load(file)["results"]}
+
+    regressions = 0
+    for key in sorted(current.keys() & baseline.keys()):
+        new, old = current[key], baseline[key]
+        problems = []
+        # Ignore timing noise below min_time seconds
+        if new["time"] > old["time"] * (1 + args.threshold) and new["time"] - old["time"] > args.min_time:
+            problems.append("time {:.4f}s -> {:.4f}s".format(old["time"], new["time"]))
+        if new["peak_memory"] > old["peak_memory"] * (1 + args.threshold):
+            problems.append("peak memory {} -> {}".format(old["peak_memory"], new["peak_memory"]))
+        if new["path_length"] != old["path_length"]:
+            problems.append("path length {} -> {}".format(old["path_length"], new["path_length"]))
+
+        status = "REGRESSION" if problems else "ok"
+        print("{:<28} {:<6} {:<10} {}".format(key[0], key[1], status, "; ".join(problems)))
+        regressions += bool(problems)
+
+    for key in sorted(baseline.keys() - current.keys()):
+        print("{:<28} {:<6} missing from results".format(*key))
+
+    print("{} regression(s) in {} compared results".format(regressions, len(current.keys() & baseline.keys())))
+    return regressions == 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the search strategies.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write a JSON report")
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--methods", default=",".join(METHODS))
+    run_parser.add_argument("--maps", default=",".join(BUNDLED_MAPS), help="comma-separated map files")
+    run_parser.add_argument("--kinds", default="rects", help="generated map kinds: " + ",".join(KINDS))
+    run_parser.add_argument("--sizes", default="100,300", help="sizes of the generated square maps")
+    run_parser.add_argument("--densities", default="0.1,0.3", help="wall densities of the generated rects maps")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3, help="timed runs per result; the fastest is kept")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a baseline report")
+    compare_parser.add_argument("results")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    compare_parser.add_argument("--min-time", type=float, default=0.005, help="ignore slowdowns below this many seconds")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    else:
+        sys.exit(0 if compare(args) else 1)
@@ -1,11 +1,30 @@
-from random import randint
+"""
+Seeded map generators for benchmark corpora.
+
+    python mapgen.py <output> [--size 1000x1000] [--kind rects|maze|rooms] [--density 0.3]
+                     [--rooms 50] [--room-size 3,12] [--goals 1] [--unreachable] [--seed 0]
+
+Kinds:
+    rects   random 1x1 to --max-rect obstacles until about --density of the grid is covered
+    maze    recursive-division maze with 1-cell corridors on even coordinates, all connected
+    rooms   rectangular rooms joined by L-shaped corridors, everything else wall
+
+The start and goals are free cells. Every goal is reachable from the start, or with
+--unreachable none is: goals go to a region the start cannot reach, and if the free space
+is connected the goals are walled in. The same arguments always give the same map. The
+walls are written one line at a time; output "-" writes to stdout.
+"""
+
+import sys
+from random import Random
 
 class GenerateRandomTexture:
-    def __init__(self, sizeOfRows: int, sizeOfCols: int, numOfWalls: int = 2, numOfGoals: int = 1) -> None:
+    def __init__(self, sizeOfRows: int, sizeOfCols: int, numOfWalls: int = 2, numOfGoals: int = 1, seed=None) -> None:
+        rng = Random(seed)
         self._grid = [sizeOfRows, sizeOfCols]
-        self._startPoint = (randint(0, sizeOfRows), randint(0, sizeOfCols))
-        self._endPoint = [(randint(0, sizeOfRows), randint(0, sizeOfCols)) for _ in range(numOfGoals)]
-        self._walls = [(randint(0, sizeOfRows), randint(0, sizeOfCols), 1, 1) for _ in range(numOfWalls)]
+        self._startPoint = (rng.randrange(sizeOfCols), rng.randrange(sizeOfRows))
+        self._endPoint = [(rng.randrange(sizeOfCols), rng.randrange(sizeOfRows)) for _ in range(numOfGoals)]
+        self._walls = [(rng.randrange(sizeOfCols), rng.randrange(sizeOfRows), 1, 1) for _ in range(numOfWalls)]
 
     def getAll(self):
         return {
@@ -15,14 +34,273 @@ class GenerateRandomTexture:
             "walls": self._walls
         }
 
-    def toText(self):
-        with open("random.txt", "w") as f:
-            f.write(f"[{self._grid[0]},{self._grid[1]}]\n")
-            f.write(f"({self._startPoint[0]},{self._startPoint[1]})\n")
-            f.write(" | ".join([f"({goal[0]},{goal[1]})" for goal in self._endPoint]) + "\n")
-            f.write("\n".join([f"({wall[0]},{wall[1]},{wall[2]},{wall[3]})" for wall in self._walls]))
+    def toText(self, filename="random.txt"):
+        write_map(filename, self._grid[1], self._grid[0], self._startPoint, self._endPoint, self._walls)
+
+def fill(grid, width, x, y, w, h, value=1):
+    """Sets an in-grid rectangle of grid to value, returning how many of its cells differed."""
+    if w == 1: # a column, as one strided slice
+        column = slice(y * width + x, (y + h) * width, width)
+        changed = h - grid[column].count(value)
+        grid[column] = bytes((value,)) * h
+        return changed
+    changed = 0
+    values = bytes((value,)) * w
+    for row in range(y * width, (y + h) * width, width):
+        changed += w - grid[row + x:row + x + w].count(value)
+        grid[row + x:row + x + w] = values
+    return changed
+
+def random_rectangles(width, height, rng, density=0.3, max_rect=5):
+    """Random 1x1 to max_rect x max_rect obstacles covering about density of the grid."""
+    if not 0 <= density < 1:
+        raise ValueError("density must be in [0, 1), got {}".format(density))
+    grid = bytearray(width * height)
+    rects = []
+    covered, target = 0, int(width * height * density)
+    while covered < target:
+        x, y = rng.randrange(width), rng.randrange(height)
+        w, h = min(rng.randint(1, max_rect), width - x), min(rng.randint(1, max_rect), height - y)
+        rects.append((x, y, w, h))
+        covered += fill(grid, width, x, y, w, h)
+    return rects, grid
+
+def maze(width, height, rng):
+    """
+    Recursive-division maze. Corridors run on even coordinates and walls on odd ones; each
+    wall gets one gap, so every free cell is connected to every other by exactly one path
+    (plus the extra free column or row when width or height is even).
+    """
+    right, bottom = (width - 1) & ~1, (height - 1) & ~1 # inclusive corridor bounds, all even
+    # The walls end up covering every odd row and column inside the bounds except for the
+    # gaps, so the grid starts as that lattice and each division only opens its gap.
+    extra = bytes(width - right - 1)
+    corridor_row = b"\x00\x01" * (right // 2) + b"\x00" + extra
+    wall_row = b"\x01" * (right + 1) + extra
+    grid = bytearray((corridor_row + wall_row) * (bottom // 2) + corridor_row + bytes(width * (height - bottom - 1)))
+
+    random = rng.random # one C call per draw instead of randrange's checks
+    rects = []
+    chambers = [(0, 0, right, bottom)]
+    while chambers:
+        x0, y0, x1, y1 = chambers.pop()
+        if x1 - x0 < 2 and y1 - y0 < 2:
+            continue
+        if y1 - y0 > x1 - x0 or (y1 - y0 == x1 - x0 and random() < 0.5):
+            y, gap = y0 + 1 + 2 * int(random() * ((y1 - y0) // 2)), x0 + 2 * int(random() * ((x1 - x0) // 2 + 1))
+            if gap > x0:
+                rects.append((x0, y, gap - x0, 1))
+            if gap < x1:
+                rects.append((gap + 1, y, x1 - gap, 1))
+            grid[y * width + gap] = 0
+            chambers += [(x0, y0, x1, y - 1), (x0, y + 1, x1, y1)]
+        else:
+            x, gap = x0 + 1 + 2 * int(random() * ((x1 - x0) // 2)), y0 + 2 * int(random() * ((y1 - y0) // 2 + 1))
+            if gap > y0:
+                rects.append((x, y0, 1, gap - y0))
+            if gap < y1:
+                rects.append((x, gap + 1, 1, y1 - gap))
+            grid[gap * width + x] = 0
+            chambers += [(x0, y0, x - 1, y1), (x + 1, y0, x1, y1)]
+    return rects, grid
+
+def rooms(width, height, rng, count=None, room_size=(3, 12)):
+    """
+    Up to count non-touching rooms (by default one per 400 cells) with sides in room_size,
+    chained by L-shaped corridors in a snaking row order so corridors stay short.
+    """
+    grid = bytearray(b"\x01") * (width * height)
+    smallest, largest = room_size
+    count = count or max(1, width * height // 400)
+    placed = []
+    for _ in range(4 * count):
+        if len(placed) == count:
+            break
+        w, h = min(rng.randint(smallest, largest), width), min(rng.randint(smallest, largest), height)
+        x, y = rng.randrange(width - w + 1), rng.randrange(height - h + 1)
+        # keep a wall between rooms, so they only connect through corridors
+        x0, x1, y0, y1 = max(x - 1, 0), min(x + w + 1, width), max(y - 1, 0), min(y + h + 1, height)
+        if any(grid[row + x0:row + x1].count(0) for row in range(y0 * width, y1 * width, width)):
+            continue
+        fill(grid, width, x, y, w, h, 0)
+        placed.append((x + w // 2, y + h // 2))
+
+    band = 2 * largest
+    placed.sort(key=lambda centre: (centre[1] // band, centre[0] if centre[1] // band % 2 == 0 else -centre[0]))
+    for (ax, ay), (bx, by) in zip(placed, placed[1:]):
+        if rng.random() < 0.5: # horizontal leg first
+            fill(grid, width, min(ax, bx), ay, abs(ax - bx) + 1, 1, 0)
+            fill(grid, width, bx, min(ay, by), 1, abs(ay - by) + 1, 0)
+        else:
+            fill(grid, width, ax, min(ay, by), 1, abs(ay - by) + 1, 0)
+            fill(grid, width, min(ax, bx), by, abs(ax - bx) + 1, 1, 0)
+    return wall_rectangles(grid, width, height), grid
+
+def wall_rectangles(grid, width, height):
+    """Covers the walls of grid with rectangles: maximal runs per row, merged with identical runs below."""
+    rects = []
+    open_runs = {} # (x0, x1) -> first row of the rectangle
+    for y in range(height + 1):
+        runs = set()
+        if y < height:
+            row, end = y * width, (y + 1) * width
+            start = grid.find(1, row, end)
+            while start >= 0:
+                stop = grid.find(0, start, end)
+                stop = end if stop < 0 else stop
+                runs.add((start - row, stop - row))
+                start = grid.find(1, stop, end)
+        for run in sorted(open_runs.keys() - runs):
+            first = open_runs.pop(run)
+            rects.append((run[0], first, run[1] - run[0], y - first))
+        for run in runs - open_runs.keys():
+            open_runs[run] = y
+    return rects
+
+KINDS = {
+    "rects": random_rectangles,
+    "maze": maze,
+    "rooms": rooms,
+}
+CONNECTED = {"maze", "rooms"} # kinds whose free cells always form one region
+
+def flood(marks, width, height, cell):
+    """Scanline flood fill setting the 0 cells of marks connected to cell to 1; returns how many it set."""
+    filled = 0
+    stack = [cell]
+    while stack:
+        cell = stack.pop()
+        if marks[cell]:
+            continue
+        row = cell - cell % width
+        left = max(marks.rfind(1, row, cell), row - 1) + 1
+        right = marks.find(1, cell, row + width)
+        right = row + width if right < 0 else right
+        marks[left:right] = b"\x01" * (right - left)
+        filled += right - left
+        for offset in (-width, width):
+            if not 0 <= row + offset < width * height:
+                continue
+            start, stop = left + offset, right + offset
+            start = marks.find(0, start, stop)
+            while start >= 0:
+                stack.append(start)
+                start = marks.find(1, start, stop)
+                start = marks.find(0, start, stop) if start >= 0 else -1
+    return filled
+
+def difference(before, after):
+    """Marks with 1 the cells that differ between two equal-length 0/1 bytearrays."""
+    return (int.from_bytes(before, "little") ^ int.from_bytes(after, "little")).to_bytes(len(before), "little")
+
+def sample(rng, marks, value, total, count, excluded=()):
+    """Picks count distinct cells marked value, of which there are total, avoiding the excluded cells."""
+    if total - len(excluded) < count:
+        raise ValueError("not enough free cells: {} needed, {} available".format(count, total - len(excluded)))
+    chosen = []
+    if total * 16 >= len(marks): # dense enough for rejection sampling
+        while len(chosen) < count:
+            cell = rng.randrange(len(marks))
+            if marks[cell] == value and cell not in chosen and cell not in excluded:
+                chosen.append(cell)
+        return chosen
+    cells = []
+    cell = marks.find(value)
+    while cell >= 0:
+        if cell not in excluded:
+            cells.append(cell)
+        cell = marks.find(value, cell + 1)
+    return rng.sample(cells, count)
+
+def place_endpoints(width, height, grid, rng, goals=1, reachable=True, connected=False):
+    """
+    Picks a start and goals on free cells of grid. Returns (start, goals, walls), where walls
+    are the 1x1 rectangles added to enclose unreachable goals when the free space is connected.
+    connected promises that it is, which skips the flood fill. Raises ValueError if there is
+    no room for them.
+    """
+    if connected:
+        reached = grid.count(0)
+        start = sample(rng, grid, 0, reached, 1)[0]
+        region, inside, free = grid, 0, 0 # the start reaches every free cell
+    else:
+        marks = bytearray(grid) # walls and every flooded region are 1
+        free = marks.count(0)
+        while True:
+            start = sample(rng, marks, 0, free, 1)[0]
+            before = bytes(marks)
+            reached = flood(marks, width, height, start)
+            free -= reached
+            if not reachable or reached >= goals + 1:
+                break
+            # too small for the goals, try another region
+        region, inside = difference(before, marks), 1 # 1 on the cells connected to the start
+    if reachable:
+        targets = sample(rng, region, inside, reached, goals, (start,))
+        walls = []
+    elif free >= goals:
+        targets = sample(rng, marks, 0, free, goals)
+        walls = []
+    else:
+        x, y = start % width, start // width
+        near = {start} | {(y + dy) * width + x + dx for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1))
+                          if 0 <= x + dx < width and 0 <= y + dy < height}
+        targets = sample(rng, region, inside, reached, goals, near)
+        walls = []
+        for target in targets:
+            x, y = target % width, target // width
+            for dx, dy in ((1, 0), (0, 1), (-1, 0), (0, -1)):
+                cell = (y + dy) * width + x + dx
+                if 0 <= x + dx < width and 0 <= y + dy < height and not grid[cell] and cell not in targets:
+                    walls.append((x + dx, y + dy, 1, 1))
+    return (start % width, start // width), [(cell % width, cell // width) for cell in targets], walls
+
+def generate(kind, width, height, seed=0, goals=1, reachable=True, **options):
+    """Returns (start, goals, rects) of a map of the given kind; options go to the KINDS generator."""
+    rng = Random(seed)
+    rects, grid = KINDS[kind](width, height, rng, **options)
+    start, targets, walls = place_endpoints(width, height, grid, rng, goals, reachable, kind in CONNECTED)
+    return start, targets, rects + walls
+
+def write_map(target, width, height, start, goals, rects):
+    """Writes a map in the GridParser format to a path or an open text file, one wall line at a time."""
+    if isinstance(target, str):
+        with open(target, "w") as file:
+            write_map(file, width, height, start, goals, rects)
+        return
+    target.write("[{},{}]\n".format(height, width))
+    target.write("({},{})\n".format(*start))
+    target.write(" | ".join("({},{})".format(*goal) for goal in goals) + "\n")
+    target.writelines("({},{},{},{})\n".format(*rect) for rect in rects)
+
+def parse_size(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height or width)
 
 if __name__ == "__main__":
-    g = GenerateRandomTexture(30, 30, 300, 2)
-    print(g.getAll())
-    print(g.toText())
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate seeded benchmark maps.")
+    parser.add_argument("output", help='map file to write, or "-" for stdout')
+    parser.add_argument("--size", type=parse_size, default=(100, 100), help="WIDTHxHEIGHT (default 100x100)")
+    parser.add_argument("--kind", choices=KINDS, default="rects")
+    parser.add_argument("--density", type=float, default=0.3, help="rects: fraction of cells to cover")
+    parser.add_argument("--max-rect", type=int, default=5, help="rects: largest obstacle side")
+    parser.add_argument("--rooms", type=int, default=None, help="rooms: number of rooms (default one per 400 cells)")
+    parser.add_argument("--room-size", type=lambda text: tuple(map(int, text.split(","))), default=(3, 12),
+                        help="rooms: smallest,largest room side")
+    parser.add_argument("--goals", type=int, default=1)
+    parser.add_argument("--unreachable", action="store_true", help="make every goal unreachable from the start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    options = {
+        "rects": {"density": args.density, "max_rect": args.max_rect},
+        "maze": {},
+        "rooms": {"count": args.rooms, "room_size": args.room_size},
+    }[args.kind]
+    width, height = args.size
+    start, goals, rects = generate(args.kind, width, height, args.seed, args.goals, not args.unreachable, **options)
+    write_map(sys.stdout if args.output == "-" else args.output, width, height, start, goals, rects)
+    print("{}: {}x{} {}, {} walls, start {}, goals {}".format(
+        args.output, width, height, args.kind, len(rects), start, goals), file=sys.stderr)
@@ -0,0 +1,91 @@
+"""
+Replays search traces recorded with `python search.py <filename> <method> --record <trace>`.
+
+    python replay.py <trace> stats [--json]
+    python replay.py <trace> play [--size 20] [--speed 0.01]
+
+While playing: space pauses/resumes, Right steps one event while paused,
++ and - double or halve the speed, Escape closes the window.
+"""
+
+import argparse
+import json
+
+from Trace import TraceReader
+
+class TraceEvents:
+    """Feeds a trace to Visualizer.play in place of an EventQueue filled by a search thread."""
+
+    def __init__(self, reader, problem):
+        self.iterator = reader.events(problem)
+
+    def get_nowait(self):
+        return next(self.iterator, None)
+
+def print_statistics(reader, as_json=False):
+    statistics = reader.statistics()
+    if as_json:
+        print(json.dumps(statistics))
+        return
+    for key, value in statistics.items():
+        print("{:<14} {}".format(key, value))
+
+def play(reader, size, speed):
+    import tkinter as tk
+    from Problem import RobotNavigation
+    from Visualizer import Visualizer
+
+    problem = RobotNavigation(reader, adjacency=False)
+    root = tk.Tk()
+    root.title("Replay - " + reader.filename)
+    renderer = Visualizer(root, problem, size, speed)
+    renderer.pack()
+
+    def toggle_pause(event):
+        renderer.paused = not renderer.paused
+
+    def step(event):
+        if renderer.paused:
+            renderer.step()
+
+    def faster(event):
+        renderer.delay /= 2
+
+    def slower(event):
+        renderer.delay = renderer.delay * 2 if renderer.delay > 0 else 1.0 / Visualizer.FRAME_RATE
+
+    def close(event=None):
+        renderer.stop()
+        root.destroy()
+
+    root.bind("<space>", toggle_pause)
+    root.bind("<Right>", step)
+    root.bind("+", faster)
+    root.bind("-", slower)
+    root.bind("<Escape>", close)
+    root.protocol("WM_DELETE_WINDOW", close)
+
+    renderer.play(TraceEvents(reader, problem), lambda node: print_statistics(reader))
+    root.mainloop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay or summarize a recorded search trace.")
+    parser.add_argument("trace")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = commands.add_parser("stats", help="print statistics of the trace")
+    stats_parser.add_argument("--json", action="store_true")
+
+    play_parser = commands.add_parser("play", help="animate the trace")
+    play_parser.add_argument("--size", type=int, default=20, help="cell size in pixels")
+    play_parser.add_argument("--speed", type=float, default=0.01, help="seconds per step, 0 for as fast as possible")
+
+    args = parser.parse_args()
+    reader = TraceReader(args.trace)
+    try:
+        if args.command == "stats":
+            print_statistics(reader, args.json)
+        else:
+            play(reader, args.size, args.speed)
+    finally:
+        reader.close()
@@ -1,60 +1,139 @@
-import tkinter as tk
-from Visualizer import *
-from Problem import RobotNavigation
-from GridParser import *
-from SearchStrategy import BreadthFirstSearch, DepthFirstSearch, AStarSearch, GreedyBestFirstSearch, CustomSearch1, CustomSearch2
-
-def runRobotNavigation(filename, method="bfs", vis = False, size = 30, speed = 0.05):
-    # Parse the grid file
-    grid_parser = GridParser(filename)
-
-    # Create the problem
-    problem = RobotNavigation(grid_parser)
-
-    # Create the visualization window
-    root = tk.Tk()
-    root.title("Visualization" + " - " + filename + " - " + method)
-
-    # Create the grid visualization
-    renderer = None
-    if vis: 
-        renderer = Visualizer(root, problem, size, speed)
-        renderer.pack()
-
-    # Solve the problem
-    strategy = None
-    if method == "bfs":
-        strategy = BreadthFirstSearch(problem, renderer)
-    elif method == "dfs":
-        strategy = DepthFirstSearch(problem, renderer)
-    elif method == "astar":
-        strategy = AStarSearch(problem, renderer)
-    elif method == "gbfs":
-        strategy = GreedyBestFirstSearch(problem, renderer)
-    elif method == "cus1":
-        strategy = CustomSearch1(problem, renderer)
-    elif method == "cus2":
-        strategy = CustomSearch2(problem, renderer)
-
+import sys
+from Problem import create_problem
+from MapFile import load_map
+from SearchStrategy import BreadthFirstSearch, DepthFirstSearch, AStarSearch, GreedyBestFirstSearch, CustomSearch1, CustomSearch2, JumpPointSearch, ALTSearch, DStarLiteSearch, UniformCostSearch
+from Hierarchical import HierarchicalSearch
+from Wavefront import WavefrontSearch
+from MemoryBounded import IterativeDeepeningAStarSearch, SMAStarSearch
+
+# tkinter and the Visualizer are imported lazily, only when a window is needed
+
+METHODS = {
+    "bfs": BreadthFirstSearch,
+    "dfs": DepthFirstSearch,
+    "ucs": UniformCostSearch,
+    "astar": AStarSearch,
+    "alt": ALTSearch,
+    "gbfs": GreedyBestFirstSearch,
+    "cus1": CustomSearch1,
+    "cus2": CustomSearch2,
+    "jps": JumpPointSearch,
+    "dstar": DStarLiteSearch,
+    "hpa": HierarchicalSearch,
+    "wave": WavefrontSearch,
+    "ida": IterativeDeepeningAStarSearch,
+    "sma": SMAStarSearch,
+}
+
+# Wall-clock budget in seconds for one headless CLI solve of a small map, checked by `python search.py startup`
+STARTUP_BUDGET = 0.15
+
+def create_strategy(method, problem, renderer=None):
+    if method not in METHODS:
+        raise ValueError("Unknown method: " + method)
+    return METHODS[method](problem, renderer)
+
+def solve(problem, method="bfs"):
+    """
+    Solves the problem without touching tkinter
+    Returns the strategy (for its statistics) and the goal node, or None
+    """
+    strategy = create_strategy(method, problem)
+    return strategy, strategy.search()
+
+def print_solution(filename, method, strategy, node):
     print(filename, method)
-    node = strategy.search()
-    
-    # Print the solution
     if node:
         path = []
         for n in node.solution():
             path.append(n[0])
         print(path, end="")
-        if vis:
-            renderer.render(found_path=node)
     else:
         print("No goal is reachable", end="")
     
     print(";",strategy.get_created_nodes())
 
+def runRobotNavigation(filename, method="bfs", vis = False, size = 30, speed = 0.05, master = None, record = None, compress = False):
+    # Parse the grid file, or memory-map its compiled copy from the map cache
+    grid_parser = load_map(filename)
+
+    # Create the problem
+    problem = create_problem(grid_parser)
+
+    if not vis:
+        if record:
+            # Also write the search events to a trace file for replay.py
+            strategy = create_strategy(method, problem)
+            node = strategy.record(record, compress)
+        else:
+            strategy, node = solve(problem, method)
+        print_solution(filename, method, strategy, node)
+        return node
+
+    import threading
+    import tkinter as tk
+    from EventQueue import EventQueue, SearchCancelled
+    from Visualizer import Visualizer
+
+    # Create the visualization window, as a child of master when it already runs a Tk loop
+    root = tk.Toplevel(master) if master else tk.Tk()
+    root.title("Visualization" + " - " + filename + " - " + method)
+
+    # Create the grid visualization
+    renderer = Visualizer(root, problem, size, speed)
+    renderer.pack()
+
+    # Solve the problem in a worker thread; the Tk loop drains its events at a capped frame rate
+    events = EventQueue()
+    strategy = create_strategy(method, problem, events)
+    result = []
+
+    def worker():
+        try:
+            node = strategy.record(record, compress) if record else strategy.search()
+            result.append(node)
+
+            # Print the solution
+            print_solution(filename, method, strategy, node)
+            events.finish(node)
+        except SearchCancelled:
+            pass
+
+    def close():
+        events.close()
+        renderer.stop()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close)
+    renderer.play(events)
+    threading.Thread(target=worker, daemon=True).start()
+
     # Start the Tkinter event loop
-    if vis:
+    if not master:
         root.mainloop()
+    return result[0] if result else None
+
+def check_startup(filename="RobotNav-test.txt", method="bfs", runs=10):
+    """
+    Times complete headless CLI invocations in fresh interpreters and compares
+    the median against STARTUP_BUDGET. Returns True if within budget.
+    """
+    import os
+    import subprocess
+    import time
+
+    script = os.path.abspath(__file__)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, filename, method], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+
+    times.sort()
+    median = times[len(times) // 2]
+    print("startup: median {:.3f}s, min {:.3f}s, max {:.3f}s over {} runs (budget {:.3f}s)".format(
+        median, times[0], times[-1], runs, STARTUP_BUDGET))
+    return median <= STARTUP_BUDGET
 
 
 # runRobotNavigation("test1.txt", "dfs", True)
@@ -73,11 +152,11 @@ def runRobotNavigation(filename, method="bfs", vis = False, size = 30, speed = 0
 # 3.948
 # 1.952
 
-from tkinter import *
-
 def main_menu():
+    from tkinter import Tk, Label, Entry, StringVar, OptionMenu, Button
+
     # Define the methods list
-    methods = ["BFS", "DFS", "AStar", "GBFS", "CUS1", "CUS2"]
+    methods = ["BFS", "DFS", "UCS", "AStar", "ALT", "GBFS", "CUS1", "CUS2", "JPS", "DStar", "HPA", "Wave", "IDA", "SMA"]
 
     # Function to handle start button click (replace with your actual logic)
     def start_clicked():
@@ -88,7 +167,7 @@ def main_menu():
         # Process filename and selected method
         # print(f"Filename: {filename}, Method: {selected_method}")
         method = selected_method.lower()
-        runRobotNavigation(filename, method, True, size, speed)
+        runRobotNavigation(filename, method, True, size, speed, root)
 
     # Initialize the main window
     root = Tk()
@@ -140,15 +219,21 @@ def main_menu():
     root.mainloop()
 
 
-import sys
 if __name__ == "__main__":
-    if len(sys.argv) == 3:
+    if len(sys.argv) in (2, 3, 4) and sys.argv[1] == "startup":
+        sys.exit(0 if check_startup(*sys.argv[2:]) else 1)
+    elif len(sys.argv) == 3:
         runRobotNavigation(sys.argv[1], sys.argv[2], vis = False)        
+    elif len(sys.argv) == 5 and sys.argv[3] in ("--record", "--record-compressed"):
+        runRobotNavigation(sys.argv[1], sys.argv[2], vis = False, record = sys.argv[4],
+                           compress = sys.argv[3] == "--record-compressed")
     elif len(sys.argv) == 2 and sys.argv[1] == "gui":
         main_menu()
     else:
         print("Usage: python search.py <filename> <method>")
         print("Or: python search.py gui")
-        print("Methods: bfs, dfs, astar, gbfs, cus1, cus2")
+        print("Or: python search.py <filename> <method> --record[-compressed] <trace>")
+        print("Or: python search.py startup [filename] [method]")
+        print("Methods: " + ", ".join(METHODS))
 
     
\ No newline at end of file
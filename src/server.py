@@ -0,0 +1,239 @@
+"""
+Long-running path query service.
+
+    python server.py --unix /tmp/robotnav.sock [--root maps] [--workers 4] [--cache-size 10000]
+    python server.py --port 8765 [--host 127.0.0.1] [--allow-remote]
+
+Clients send one JSON object per line and get one JSON object per line back:
+
+    {"id": 1, "map": "maps/1.txt", "method": "astar", "start": [0, 1], "goals": [[7, 0]]}
+    {"id": 1, "path": ["right", "up", ...], "path_length": 9, "created_nodes": 41, "time": 0.0004, "cached": false}
+
+map names are resolved inside the map root (--root, default: the current directory);
+names that lead outside it are refused. start and goals are optional and default to
+the ones in the map file, and must lie inside the grid. Requests on one connection
+are answered as they finish, so responses may come back out of order; id is echoed
+back to match them. Failures are answered with {"id", "error"}; errors that could
+quote the map file are only logged to stderr. {"op": "stats"} returns the cache
+counters. TCP listens on loopback addresses only, unless --allow-remote is given.
+
+Solves run in a process pool. Each worker keeps its parsed maps, adjacency tables
+and per-map heuristic data resident (keyed by path and modification time, so an
+edited map is reloaded), and the server keeps an LRU cache of recent results.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from MapFile import load_map
+from Problem import create_problem
+from search import METHODS, create_strategy
+
+MAP_CACHE_SIZE = 64 # parsed maps kept per worker process
+_maps = OrderedDict() # (path, mtime) -> parsed or compiled map, per worker process
+
+class QueryError(ValueError):
+    """A malformed or refused query; its message is safe to send back to the client."""
+
+def cached_map(filename, mtime):
+    """Returns the parsed map, reusing the worker's copy while the file is unchanged."""
+    key = (filename, mtime)
+    parser = _maps.get(key)
+    if parser is None:
+        parser = _maps[key] = load_map(filename)
+        if len(_maps) > MAP_CACHE_SIZE:
+            _maps.popitem(last=False)
+    else:
+        _maps.move_to_end(key)
+    return parser
+
+def solve_query(filename, name, mtime, method, start, goals):
+    """Solves one query. Runs in a worker process."""
+    try:
+        parser = cached_map(filename, mtime)
+    except (OSError, ValueError) as error:
+        # parse errors quote the offending line, so the client only learns which map failed
+        print(error, file=sys.stderr)
+        raise QueryError("cannot load map " + name) from None
+    width, height = parser.grid_w, parser.grid_h
+    for x, y in ([start] if start is not None else []) + (goals or []):
+        if not (0 <= x < width and 0 <= y < height):
+            raise QueryError("state [{}, {}] is outside the {}x{} grid".format(x, y, width, height))
+    problem = create_problem(parser, initial=start, goals=goals)
+    started = time.perf_counter()
+    strategy = create_strategy(method, problem)
+    node = strategy.search()
+    path = [action[0] for action in node.solution()] if node else None
+    return {
+        "path": path,
+        "path_length": len(path) if path is not None else None,
+        "created_nodes": strategy.get_created_nodes(),
+        "time": time.perf_counter() - started,
+    }
+
+def parse_state(value):
+    if not isinstance(value, (list, tuple)) or len(value) != 2 or not all(isinstance(v, int) for v in value):
+        raise QueryError("states must be [x, y] integer pairs, got " + json.dumps(value))
+    return tuple(value)
+
+class PathServer:
+    """Accepts JSON-lines connections and answers path queries from a process pool."""
+
+    def __init__(self, workers=None, cache_size=10000, root="."):
+        self.root = os.path.realpath(root)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.cache_size = cache_size
+        self.results = OrderedDict() # query key -> result, least recently used first
+        self.pending = {} # query key -> future of a solve in progress, shared by duplicates
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_client(self, reader, writer):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self.respond(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def respond(self, line, writer):
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise QueryError("requests must be JSON lines") from None
+            if not isinstance(request, dict):
+                raise QueryError("requests must be JSON objects")
+            request_id = request.get("id")
+            if request.get("op") == "stats":
+                response = self.statistics()
+            else:
+                response = dict(await self.query(request))
+        except QueryError as error:
+            response = {"error": str(error)}
+        except Exception as error:
+            print("query failed: {!r}".format(error), file=sys.stderr)
+            response = {"error": "internal error"}
+        response["id"] = request_id
+        try:
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+        except ConnectionError:
+            pass # the client went away
+
+    async def query(self, request):
+        name = request.get("map")
+        method = request.get("method", "bfs")
+        if not isinstance(name, str):
+            raise QueryError("missing map")
+        if not isinstance(method, str) or method not in METHODS:
+            raise QueryError("unknown method: {} (methods: {})".format(method, ", ".join(METHODS)))
+        start = parse_state(request["start"]) if request.get("start") is not None else None
+        goals = request.get("goals")
+        if goals is not None:
+            if not isinstance(goals, list) or not goals:
+                raise QueryError("goals must be a non-empty list of [x, y] pairs")
+            goals = [parse_state(goal) for goal in goals]
+
+        filename = self.resolve(name)
+        try:
+            mtime = os.stat(filename).st_mtime_ns
+        except OSError:
+            raise QueryError("no such map: " + name) from None
+        key = (filename, mtime, method, start, tuple(goals) if goals is not None else None)
+
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return dict(result, cached=True)
+
+        self.misses += 1
+        future = self.pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.pending[key] = loop.run_in_executor(self.executor, solve_query, filename, name, mtime, method, start, goals)
+            future.add_done_callback(lambda done: self.store(key, done))
+        # shielded, so a client that disconnects does not cancel a solve others wait for
+        result = await asyncio.shield(future)
+        return dict(result, cached=False)
+
+    def resolve(self, name):
+        """Returns the real path of a map name under the map root, refusing names that leave it."""
+        path = os.path.realpath(os.path.join(self.root, name))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise QueryError("map outside the map root: " + name)
+        return path
+
+    def store(self, key, future):
+        del self.pending[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.results[key] = future.result()
+        if len(self.results) > self.cache_size:
+            self.results.popitem(last=False)
+
+    def statistics(self):
+        return {"cached_results": len(self.results), "hits": self.hits, "misses": self.misses, "pending": len(self.pending)}
+
+    def close(self):
+        self.executor.shutdown()
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False # a host name: it may resolve to anything
+
+async def serve(server, unix=None, host="127.0.0.1", port=8765):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle_client, path=unix)
+    else:
+        listener = await asyncio.start_server(server.handle_client, host, port)
+    # stop cleanly on SIGTERM as well as Ctrl+C, so the Unix socket file is removed
+    loop = asyncio.get_running_loop()
+    stopped = loop.create_future()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, lambda: stopped.done() or stopped.set_result(None))
+    async with listener:
+        await stopped
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer path queries over a Unix or TCP socket.")
+    parser.add_argument("--unix", help="Unix socket path (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--allow-remote", action="store_true", help="allow a non-loopback --host")
+    parser.add_argument("--root", default=".", help="directory map names are resolved in (default: current directory)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache-size", type=int, default=10000, help="results kept in the LRU cache")
+    args = parser.parse_args()
+    if not args.unix and not args.allow_remote and not is_loopback(args.host):
+        parser.error("--host {} is not a loopback address; pass --allow-remote to accept remote clients".format(args.host))
+
+    server = PathServer(args.workers, args.cache_size, args.root)
+    try:
+        asyncio.run(serve(server, args.unix, args.host, args.port))
+    finally:
+        server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)